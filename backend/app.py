@@ -1,15 +1,50 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, g, make_response, redirect, url_for
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_jwt_identity
 import sqlite3
 import os
+import re
 import json
+import csv
+import io
 import uuid
-from datetime import datetime, timedelta
-from werkzeug.utils import secure_filename
-from werkzeug.security import generate_password_hash, check_password_hash
-from PIL import Image
+import base64
+import hashlib
+import time
+import math
+import queue
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from datetime import datetime, timedelta, timezone
+from werkzeug.utils import safe_join
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.wsgi import get_input_stream
+from werkzeug.exceptions import RequestEntityTooLarge, NotFound
+from werkzeug.sansio.multipart import MultipartDecoder, NeedData, Epilogue, Field, File, Data
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from PIL import Image, ImageDraw
 import shutil
+import mimetypes
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pillow_avif  # noqa: F401  registers the AVIF codec with Pillow
+except ImportError:
+    pass
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -18,17 +53,239 @@ app.config['JWT_SECRET_KEY'] = 'jwt-secret-string-change-this-in-production'
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
 
 # Configure file uploads
-UPLOAD_FOLDER = '../uploads'
+UPLOAD_FOLDER = os.environ.get('UPLOAD_PATH', '../uploads')
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max request body
+
+# Image uploads are streamed to disk, so they get their own limits
+app.config['UPLOAD_MAX_REQUEST_SIZE'] = int(os.environ.get('UPLOAD_MAX_REQUEST_SIZE', 200 * 1024 * 1024))
+app.config['UPLOAD_MAX_FILE_SIZE'] = int(os.environ.get('UPLOAD_MAX_FILE_SIZE', 16 * 1024 * 1024))
+app.config['UPLOAD_MAX_FILES'] = int(os.environ.get('UPLOAD_MAX_FILES', 30))
+
+# How /uploads hands files out: '' streams them from Python, 'x-accel' lets
+# nginx serve them via X-Accel-Redirect, 'x-sendfile' sets X-Sendfile for
+# Apache/lighttpd
+app.config['UPLOAD_SENDFILE_MODE'] = os.environ.get('UPLOAD_SENDFILE_MODE', '').lower()
+app.config['UPLOAD_ACCEL_PREFIX'] = os.environ.get('UPLOAD_ACCEL_PREFIX', '/protected-uploads/')
+app.config['USE_X_SENDFILE'] = app.config['UPLOAD_SENDFILE_MODE'] == 'x-sendfile'
+app.config['UPLOAD_MAX_AGE'] = int(os.environ.get('UPLOAD_MAX_AGE', 31536000))  # For hash- and uuid-named uploads
+
+# Background image processing
+app.config['IMAGE_WORKERS'] = int(os.environ.get('IMAGE_WORKERS', 2))  # 0 processes uploads inline
+app.config['IMAGE_JOB_LEASE'] = int(os.environ.get('IMAGE_JOB_LEASE', 120))  # Seconds before a stuck job is retried
+app.config['IMAGE_JOB_MAX_ATTEMPTS'] = int(os.environ.get('IMAGE_JOB_MAX_ATTEMPTS', 3))
+# Seconds before a failed job is retried, doubled after each further failure
+app.config['IMAGE_JOB_RETRY_DELAY'] = int(os.environ.get('IMAGE_JOB_RETRY_DELAY', 30))
+
+# Widths (px) of the responsive variants generated for each project image
+app.config['IMAGE_VARIANT_WIDTHS'] = tuple(
+    int(width) for width in os.environ.get('IMAGE_VARIANT_WIDTHS', '320,640,1280,1920').split(',')
+)
+
+# Modern encodings written next to each JPEG/PNG upload (as <name>.<ext>.<format>)
+app.config['IMAGE_MODERN_FORMATS'] = tuple(
+    fmt.strip() for fmt in os.environ.get('IMAGE_MODERN_FORMATS', 'avif,webp').split(',') if fmt.strip()
+)
+
+# Public API response cache
+app.config['RESPONSE_CACHE_TTL'] = float(os.environ.get('RESPONSE_CACHE_TTL', 300))  # Seconds
+app.config['RESPONSE_CACHE_MAX_ENTRIES'] = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 256))
+# How often (ms) a process re-reads cache_generations to see other workers' writes
+app.config['RESPONSE_CACHE_CHECK_INTERVAL'] = int(os.environ.get('RESPONSE_CACHE_CHECK_INTERVAL', 1000))
+
+# Placeholder images: size limits and how many rendered sizes stay in memory
+app.config['PLACEHOLDER_MAX_WIDTH'] = int(os.environ.get('PLACEHOLDER_MAX_WIDTH', 2000))
+app.config['PLACEHOLDER_MAX_HEIGHT'] = int(os.environ.get('PLACEHOLDER_MAX_HEIGHT', 2000))
+app.config['PLACEHOLDER_CACHE_ENTRIES'] = int(os.environ.get('PLACEHOLDER_CACHE_ENTRIES', 32))
+# Only these sizes (the ones the site links to) are also written to disk;
+# any other size is rendered on demand and kept in memory only
+app.config['PLACEHOLDER_STORED_SIZES'] = frozenset(
+    tuple(int(side) for side in size.strip().split('x'))
+    for size in os.environ.get(
+        'PLACEHOLDER_STORED_SIZES', '300x200,300x300,400x250,400x300,500x300,800x600'
+    ).split(',') if size.strip()
+)
+
+# /metrics: when set, scrapes must send "Authorization: Bearer <token>"
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN', '')
+
+# SQL profiling (both off by default): log statements slower than
+# SLOW_QUERY_MS with their query plan, and report per-request SQL totals in
+# a Server-Timing header
+app.config['SLOW_QUERY_MS'] = float(os.environ.get('SLOW_QUERY_MS', 0))
+app.config['SQL_SERVER_TIMING'] = os.environ.get('SQL_SERVER_TIMING', 'false').lower() == 'true'
+
+# Response compression: bodies smaller than this are sent as-is
+app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', 500))
+app.config['COMPRESS_GZIP_LEVEL'] = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+app.config['COMPRESS_BROTLI_QUALITY'] = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 5))
+
+# Admin login: password hashes are checked on a small dedicated pool.
+# LOGIN_MAX_PENDING more logins may wait for it; any beyond that get a 429.
+app.config['LOGIN_HASH_WORKERS'] = int(os.environ.get('LOGIN_HASH_WORKERS', 2))
+app.config['LOGIN_MAX_PENDING'] = int(os.environ.get('LOGIN_MAX_PENDING', 4))
+app.config['LOGIN_TIMEOUT'] = float(os.environ.get('LOGIN_TIMEOUT', 10))  # Seconds to wait for a verification
+app.config['LOGIN_RETRY_AFTER'] = int(os.environ.get('LOGIN_RETRY_AFTER', 5))  # Retry-After sent with a 429
+# Stored hashes made with other parameters are replaced on the next successful login
+app.config['LOGIN_HASH_METHOD'] = os.environ.get('LOGIN_HASH_METHOD', 'scrypt')
+
+# Token-bucket rate limits for public write endpoints, as "<requests>/<seconds>"
+# per client IP and across all clients; an empty value disables that bucket
+app.config['RATE_LIMITS'] = {
+    'contact': {
+        'ip': os.environ.get('RATE_LIMIT_CONTACT_IP', '5/60'),
+        'global': os.environ.get('RATE_LIMIT_CONTACT_GLOBAL', '120/60'),
+    },
+    'login': {
+        'ip': os.environ.get('RATE_LIMIT_LOGIN_IP', '10/60'),
+        'global': os.environ.get('RATE_LIMIT_LOGIN_GLOBAL', '60/60'),
+    },
+}
+# 'memory' keeps buckets per process; 'sqlite' shares them between the
+# workers on a host through RATE_LIMIT_DB (a file of its own, not the site
+# database). gunicorn.conf.py makes sqlite the default for multi-worker serving.
+app.config['RATE_LIMIT_BACKEND'] = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+app.config['RATE_LIMIT_DB'] = os.environ.get('RATE_LIMIT_DB', '../database/rate_limits.db')
+app.config['RATE_LIMIT_MAX_KEYS'] = int(os.environ.get('RATE_LIMIT_MAX_KEYS', 10000))
+# Reverse proxies in front of the app whose X-Forwarded-For is trusted for client IPs
+app.config['PROXY_COUNT'] = int(os.environ.get('PROXY_COUNT', 0))
+
+# Contact form posts are spooled to disk, then written to the database in
+# batches every CONTACT_FLUSH_INTERVAL ms or CONTACT_FLUSH_ROWS rows
+# (an interval of 0 writes each one directly)
+app.config['CONTACT_SPOOL_DIR'] = os.environ.get('CONTACT_SPOOL_DIR', '../database/contact_spool')
+app.config['CONTACT_FLUSH_INTERVAL'] = int(os.environ.get('CONTACT_FLUSH_INTERVAL', 200))
+app.config['CONTACT_FLUSH_ROWS'] = int(os.environ.get('CONTACT_FLUSH_ROWS', 100))
+
+# Largest page the public project list will return in one response
+app.config['PROJECTS_MAX_PAGE_SIZE'] = int(os.environ.get('PROJECTS_MAX_PAGE_SIZE', 100))
+
+# Admin contact list page size, and the largest page a client may ask for
+app.config['CONTACTS_PAGE_SIZE'] = int(os.environ.get('CONTACTS_PAGE_SIZE', 50))
+app.config['CONTACTS_MAX_PAGE_SIZE'] = int(os.environ.get('CONTACTS_MAX_PAGE_SIZE', 200))
+
+# Rows fetched and sent per chunk by the CSV/NDJSON exports
+app.config['EXPORT_BATCH_SIZE'] = int(os.environ.get('EXPORT_BATCH_SIZE', 500))
+
+# JSON serialization
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Output matches the default provider (sorted keys, compact unless in
+    debug mode, HTTP dates for datetimes); calls passing stdlib json options
+    fall back to the default implementation.
+    """
+
+    def _options(self, pretty=False):
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._options(pretty) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
+def json_array_response(items):
+    """Response for a JSON array whose elements are already serialized"""
+    return app.response_class(f"[{','.join(items)}]\n", mimetype='application/json')
 
 # Initialize extensions
-CORS(app, origins=["*"])  # Configure for production
+CORS(app, origins=["*"], expose_headers=['X-Total-Count', 'X-Next-Cursor'])  # Configure for production
 jwt = JWTManager(app)
 
 # Database setup
-DATABASE = '../database/steel_website.db'
+DATABASE = os.environ.get('DATABASE_PATH', '../database/steel_website.db')
+app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 8))  # Max open connections per process
+app.config['DB_POOL_TIMEOUT'] = float(os.environ.get('DB_POOL_TIMEOUT', 5))  # Seconds to wait for a free connection
+app.config['DB_POOL_IDLE_CHECK'] = float(os.environ.get('DB_POOL_IDLE_CHECK', 30))  # Idle seconds before a health check
+
+# SQLite storage profile, applied once to every connection when it is opened.
+# WAL lets public readers keep reading while an admin write is in progress.
+app.config['SQLITE_PRAGMAS'] = {
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),  # ms to wait on a locked database
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -16000)),  # negative values are KiB
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 64 * 1024 * 1024)),
+    'temp_store': os.environ.get('SQLITE_TEMP_STORE', 'MEMORY')
+}
+
+# What to do when a public query plan falls back to a table scan at startup:
+# 'warn' prints a warning, 'strict' refuses to start, 'off' skips the check
+app.config['QUERY_PLAN_CHECK'] = os.environ.get('QUERY_PLAN_CHECK', 'warn')
+
+# Secondary indexes backing the public read paths and the admin contact list,
+# kept in sync by init_db()
+DB_INDEXES = {
+    'idx_project_images_project_main': 'project_images (project_id, is_main)',
+    'idx_projects_status_created': 'projects (status, created_at)',
+    'idx_projects_status_featured_created': 'projects (status, featured, created_at)',
+    'idx_projects_status_category_created': 'projects (status, category, created_at)',
+    'idx_projects_updated': 'projects (updated_at)',
+    'idx_hero_images_order': 'hero_images (display_order, created_at)',
+    'idx_employees_active_order': 'employees (is_active, display_order, name)',
+    'idx_contact_cards_active_order': 'contact_cards (is_active, display_order, title)',
+    'idx_project_images_path': 'project_images (image_path)',
+    'idx_image_jobs_status': 'image_jobs (status, id)',
+    'idx_contacts_status_created': 'contacts (status, created_at)',
+    'idx_contacts_created': 'contacts (created_at)'
+}
+
+# Full-text search indexes: FTS5 table -> (content table, indexed columns).
+# bm25 weights rank a hit in an earlier column above one in a later column.
+SEARCH_INDEXES = {
+    'projects_fts': ('projects', ('title', 'description', 'location')),
+    'contacts_fts': ('contacts', ('name', 'email', 'company', 'message'))
+}
+SEARCH_WEIGHTS = {
+    'projects_fts': (10.0, 1.0, 5.0),
+    'contacts_fts': (10.0, 10.0, 5.0, 1.0)
+}
+SEARCH_MAX_TERMS = 8
+
+def detect_fts5():
+    """Check whether the linked SQLite library was built with FTS5"""
+    try:
+        conn = sqlite3.connect(':memory:')
+        conn.execute('CREATE VIRTUAL TABLE fts5_probe USING fts5(body)')
+        conn.close()
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+FTS5_AVAILABLE = detect_fts5()
+
+def apply_pragmas(conn):
+    """Apply the configured storage profile to a connection"""
+    for name, value in app.config['SQLITE_PRAGMAS'].items():
+        if value is not None:
+            conn.execute(f'PRAGMA {name} = {value}')
+
+def connect_db():
+    """Open a tuned connection to the site database"""
+    # Connections move between threads (pool checkouts, the writer), but only
+    # one thread uses a connection at a time, so the same-thread check is off
+    conn = sqlite3.connect(DATABASE, check_same_thread=False, factory=InstrumentedConnection)
+    conn.row_factory = sqlite3.Row
+    apply_pragmas(conn)
+    return conn
 
 def init_db():
     """Initialize the database with required tables"""
@@ -36,8 +293,10 @@ def init_db():
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
     os.makedirs(f"{UPLOAD_FOLDER}/projects", exist_ok=True)
     os.makedirs(f"{UPLOAD_FOLDER}/gallery", exist_ok=True)
+    os.makedirs(f"{UPLOAD_FOLDER}/{BLOB_FOLDER}/tmp", exist_ok=True)
     
     conn = sqlite3.connect(DATABASE)
+    apply_pragmas(conn)  # Switches the database file to WAL once, up front
     cursor = conn.cursor()
     
     # Admin users table
@@ -75,11 +334,23 @@ def init_db():
             image_path TEXT,
             image_name TEXT,
             is_main BOOLEAN DEFAULT 0,
+            width INTEGER,
+            height INTEGER,
+            variants TEXT,
+            processing_status TEXT DEFAULT 'ready',
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (project_id) REFERENCES projects (id)
         )
     ''')
     
+    # Columns added after the first release
+    ensure_columns(cursor, 'project_images', {
+        'width': 'INTEGER',
+        'height': 'INTEGER',
+        'variants': 'TEXT',  # JSON list of {width, height, path}
+        'processing_status': "TEXT DEFAULT 'ready'"  # pending, ready or failed
+    })
+    
     # Contact submissions table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS contacts (
@@ -94,6 +365,12 @@ def init_db():
         )
     ''')
     
+    # Set on form posts so a spooled submission is only ever inserted once
+    ensure_columns(cursor, 'contacts', {
+        'submission_id': 'TEXT'
+    })
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_contacts_submission ON contacts (submission_id)')
+    
     # Home content table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS home_content (
@@ -112,10 +389,56 @@ def init_db():
             original_name TEXT,
             alt_text TEXT,
             display_order INTEGER DEFAULT 0,
+            processing_status TEXT DEFAULT 'ready',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    ensure_columns(cursor, 'hero_images', {
+        'processing_status': "TEXT DEFAULT 'ready'"
+    })
+    
+    # Content-addressed image files shared by project and hero images
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS blobs (
+            hash TEXT PRIMARY KEY,
+            path TEXT UNIQUE NOT NULL,
+            refcount INTEGER DEFAULT 1,
+            width INTEGER,
+            height INTEGER,
+            variants TEXT,
+            processing_status TEXT DEFAULT 'pending',
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
     
+    # Image processing jobs, worked off by ImageJobQueue
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS image_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            image_path TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            attempts INTEGER DEFAULT 0,
+            error TEXT,
+            not_before TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    ensure_columns(cursor, 'image_jobs', {
+        'not_before': 'TIMESTAMP'
+    })
+    
+    # Response cache generations, bumped by every write to cached data
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cache_generations (
+            namespace TEXT PRIMARY KEY,
+            generation INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    
     # Employees table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS employees (
@@ -169,25 +492,1492 @@ def init_db():
     # Create default admin user if not exists
     cursor.execute("SELECT * FROM admins WHERE username = ?", ('admin',))
     if not cursor.fetchone():
-        default_password = generate_password_hash('admin123')  # Change in production
+        default_password = generate_password_hash('admin123', method=app.config['LOGIN_HASH_METHOD'])  # Change in production
         cursor.execute(
             "INSERT INTO admins (username, password_hash) VALUES (?, ?)",
             ('admin', default_password)
         )
     
+    # Create any missing secondary indexes
+    for index_name, definition in DB_INDEXES.items():
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {index_name} ON {definition}')
+    
+    if FTS5_AVAILABLE:
+        ensure_search_indexes(cursor)
+    else:
+        print("Warning: SQLite was built without FTS5, search falls back to LIKE scans")
+    
     conn.commit()
+    
+    # Refresh planner statistics for the new indexes
+    conn.execute('PRAGMA optimize')
+    
+    if app.config['QUERY_PLAN_CHECK'] != 'off':
+        conn.row_factory = sqlite3.Row
+        check_query_plans(conn, strict=app.config['QUERY_PLAN_CHECK'] == 'strict')
+    
     conn.close()
 
+def ensure_columns(cursor, table, columns):
+    """Add any of the given columns that an older database is missing"""
+    existing = {row[1] for row in cursor.execute(f'PRAGMA table_info({table})').fetchall()}
+    for name, definition in columns.items():
+        if name not in existing:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+
+def ensure_search_indexes(cursor):
+    """Create the FTS5 indexes and the triggers that keep them in sync"""
+    for fts_table, (table, columns) in SEARCH_INDEXES.items():
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts_table,)
+        ).fetchone()
+        
+        column_list = ', '.join(columns)
+        new_values = ', '.join(f'new.{column}' for column in columns)
+        old_values = ', '.join(f'old.{column}' for column in columns)
+        
+        # External content table: the FTS index stores no second copy of the text
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+                {column_list},
+                content='{table}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_insert AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts_table} (rowid, {column_list}) VALUES (new.id, {new_values});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_delete AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts_table} ({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_update AFTER UPDATE OF {column_list} ON {table} BEGIN
+                INSERT INTO {fts_table} ({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+                INSERT INTO {fts_table} (rowid, {column_list}) VALUES (new.id, {new_values});
+            END
+        ''')
+        
+        # Index rows that existed before the search table was added
+        if not exists:
+            cursor.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+
+def build_match_query(text):
+    """Turn free text into an FTS5 query where every word must match as a prefix.
+
+    Returns None when the text contains no searchable words. Quoting each
+    term keeps FTS5 operators and punctuation in user input from being parsed.
+    """
+    terms = re.findall(r'\w+', text or '')[:SEARCH_MAX_TERMS]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+def public_query_plans():
+    """Public read queries to verify, as (name, sql, params, full_scan_ok).
+
+    full_scan_ok names the tables (or aliases) a query is expected to read in
+    full, e.g. the small key/value home_content table.
+    """
+    return [
+        ('projects', *build_projects_query(), ()),
+        ('projects_featured', *build_projects_query(featured=True, limit=3), ()),
+        ('projects_by_category', *build_projects_query(category='industrial'), ()),
+        ('projects_page', *build_projects_query(limit=13, cursor=('2024-01-01 00:00:00', 1), fields=['id', 'title']), ()),
+        ('projects_json', *build_projects_query(limit=13, as_json=True), ('v',)),  # v: json_each over one row's variants
+        ('projects_count', *build_projects_count_query(featured=True), ()),
+        ('project_detail', PROJECT_DETAIL_SQL, (1,), ()),
+        ('project_images', PROJECT_IMAGES_SQL, (1,), ()),
+        ('home_content', HOME_CONTENT_SQL, (), ('home_content',)),
+        ('hero_images', HERO_IMAGES_SQL, (), ('hero_images',)),
+        ('company_info', SETTINGS_BY_PREFIX_SQL, ('company_%',), ('home_content',)),
+        ('employees', PUBLIC_EMPLOYEES_SQL, (), ()),
+        ('contact_cards', PUBLIC_CONTACT_CARDS_SQL, (), ()),
+        ('cache_generations', CACHE_GENERATIONS_SQL, (), ('cache_generations',)),
+        ('admin_contacts_page', *build_contacts_query({'status': 'new'}, limit=51, cursor=('2024-01-01 00:00:00', 1)), ())
+    ]
+
+def check_query_plans(conn, strict=False):
+    """Run EXPLAIN QUERY PLAN on every public query and report table scans"""
+    problems = []
+    for name, sql, params, full_scan_ok in public_query_plans():
+        for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall():
+            detail = row['detail']
+            if detail.startswith('SCAN ') and detail.split()[1] not in full_scan_ok:
+                problems.append(f"{name}: {detail}")
+    
+    if problems:
+        message = 'Public queries fall back to a table scan: ' + '; '.join(problems)
+        if strict:
+            raise RuntimeError(message)
+        print(f"Warning: {message}")
+    return problems
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# Image processing
+def save_image(img, file_path):
+    """Save an image with compression settings suited to its format"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in ('.jpg', '.jpeg'):
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        img.save(file_path, 'JPEG', optimize=True, quality=82, progressive=True)
+    elif ext == '.webp':
+        img.save(file_path, 'WEBP', quality=80, method=4)
+    else:
+        img.save(file_path, optimize=True)
+
+# Format name -> (mimetype, Pillow format, save options)
+MODERN_FORMATS = {
+    'avif': ('image/avif', 'AVIF', {'quality': 60}),
+    'webp': ('image/webp', 'WEBP', {'quality': 80, 'method': 4})
+}
+TRANSCODED_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+
+def modern_formats():
+    """Configured modern formats this Pillow build can encode"""
+    registered = Image.registered_extensions()
+    return [fmt for fmt in app.config['IMAGE_MODERN_FORMATS']
+            if fmt in MODERN_FORMATS and f'.{fmt}' in registered]
+
+def generate_modern_formats(relative_path):
+    """Write WebP/AVIF siblings of a JPEG or PNG upload.
+
+    A sibling is only kept when it is smaller than the source, so the
+    /uploads route can serve it whenever the client accepts the format.
+    """
+    if os.path.splitext(relative_path)[1].lower() not in TRANSCODED_EXTENSIONS:
+        return []
+    
+    source_path = os.path.join(UPLOAD_FOLDER, relative_path)
+    source_size = os.path.getsize(source_path)
+    written = []
+    with Image.open(source_path) as img:
+        if img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+        for fmt in modern_formats():
+            _, pillow_format, options = MODERN_FORMATS[fmt]
+            target_path = f"{source_path}.{fmt}"
+            img.save(target_path, pillow_format, **options)
+            if os.path.getsize(target_path) < source_size:
+                written.append(f"{relative_path}.{fmt}")
+            else:
+                os.remove(target_path)
+    return written
+
+def choose_image_encoding(filename, accept_mimetypes):
+    """Pick the smallest stored encoding of an upload the client accepts.
+
+    Returns (relative path, mimetype); the mimetype is None for the original.
+    Only formats named explicitly in Accept count, since browsers send */*
+    without being able to decode everything.
+    """
+    accepted = {mimetype for mimetype, quality in accept_mimetypes if quality > 0}
+    original = safe_join(UPLOAD_FOLDER, filename)
+    if original is None or not os.path.isfile(original):
+        return filename, None
+    
+    best = (os.path.getsize(original), filename, None)
+    for fmt, (mimetype, _, _) in MODERN_FORMATS.items():
+        if mimetype not in accepted:
+            continue
+        sibling = f"{original}.{fmt}"
+        if os.path.isfile(sibling):
+            size = os.path.getsize(sibling)
+            if size < best[0]:
+                best = (size, f"{filename}.{fmt}", mimetype)
+    return best[1], best[2]
+
+def generate_image_variants(relative_path):
+    """Write downscaled copies of an upload for responsive srcset use.
+
+    One variant is written next to the original (as <name>_<width>w.<ext>)
+    for each configured width smaller than the image. The original is listed
+    last as the largest candidate. Returns (width, height, variants).
+    """
+    source_path = os.path.join(UPLOAD_FOLDER, relative_path)
+    stem, ext = os.path.splitext(relative_path)
+    
+    with Image.open(source_path) as img:
+        width, height = img.size
+        variants = [{'width': width, 'height': height, 'path': relative_path}]
+        
+        # Animated GIFs would lose their frames, so they are served as-is
+        if getattr(img, 'is_animated', False):
+            return width, height, variants
+        
+        # Downscale step by step from the largest target so each resize
+        # works from the previous, smaller image
+        current = img
+        for target_width in sorted(app.config['IMAGE_VARIANT_WIDTHS'], reverse=True):
+            if target_width >= width:
+                continue
+            target_height = max(1, round(height * target_width / width))
+            current = current.resize((target_width, target_height), Image.Resampling.LANCZOS)
+            variant_path = f"{stem}_{target_width}w{ext}"
+            save_image(current, os.path.join(UPLOAD_FOLDER, variant_path))
+            variants.insert(0, {'width': target_width, 'height': target_height, 'path': variant_path})
+    
+    return width, height, variants
+
+def optimize_image(relative_path):
+    """Clamp an upload to 1920x1080; returns the path of the image to use.
+
+    Uploads are served as immutable from the moment they are stored, so an
+    oversized one is re-encoded to a new file (<name>_<w>x<h><ext>) rather
+    than rewritten in place. The original blob URL then redirects to it.
+    """
+    file_path = os.path.join(UPLOAD_FOLDER, relative_path)
+    with Image.open(file_path) as img:
+        if img.width <= 1920 and img.height <= 1080:
+            return relative_path
+        img.thumbnail((1920, 1080), Image.Resampling.LANCZOS)
+        stem, ext = os.path.splitext(relative_path)
+        clamped_path = f"{stem}_{img.width}x{img.height}{ext}"
+        img.save(os.path.join(UPLOAD_FOLDER, clamped_path), optimize=True, quality=85)
+    return clamped_path
+
+def process_project_image(relative_path):
+    path = optimize_image(relative_path)
+    width, height, variants = generate_image_variants(path)
+    for variant in variants:
+        generate_modern_formats(variant['path'])
+    return {'path': path, 'width': width, 'height': height, 'variants': json.dumps(variants)}
+
+def process_hero_image(relative_path):
+    path = optimize_image(relative_path)
+    generate_modern_formats(path)
+    return {'path': path}
+
+# hero_images.filename holds a blob path, or a bare name under gallery/ for
+# images uploaded before the blob store
+HERO_IMAGE_PATH_SQL = "CASE WHEN instr(filename, '/') > 0 THEN filename ELSE 'gallery/' || filename END"
+
+def hero_image_path(filename):
+    """Upload-relative path of a hero image"""
+    return filename if '/' in filename else f"gallery/{filename}"
+
+# Table -> column and SQL expression for its upload path, and the processing
+# results it stores
+IMAGE_TABLES = {
+    'blobs': ('path', 'path', ('width', 'height', 'variants')),
+    'project_images': ('image_path', 'image_path', ('width', 'height', 'variants')),
+    'hero_images': ('filename', HERO_IMAGE_PATH_SQL, ())
+}
+
+# Job kind -> processing function, the tables holding the image, and the
+# response cache namespaces to drop when it is done
+IMAGE_JOB_KINDS = {
+    'blob': (process_project_image, ('blobs', 'project_images', 'hero_images'), ('projects', 'home_content')),
+    'project_image': (process_project_image, ('project_images',), ('projects',)),
+    'hero_image': (process_hero_image, ('hero_images',), ('home_content',))
+}
+
+# image_jobs rows a worker may take: pending and due, or abandoned past the lease
+CLAIMABLE_JOBS_SQL = '''
+    (status = 'pending' AND (not_before IS NULL OR not_before <= datetime('now')))
+    OR (status = 'processing' AND updated_at < datetime('now', ?))
+'''
+
+class ImageJobQueue:
+    """Runs image processing on background threads instead of the request.
+
+    Jobs are rows in image_jobs, so work queued before a crash or restart is
+    picked up again. A job left in 'processing' longer than the lease is
+    treated as abandoned and retried, up to max_attempts; a failed one is
+    retried after retry_delay seconds, doubling each time. Several processes
+    can share the table; claiming a job is a single atomic UPDATE.
+    """
+
+    def __init__(self, workers=2, lease=120, max_attempts=3, retry_delay=30, poll_interval=2.0):
+        self.workers = workers
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.reset()
+
+    def reset(self):
+        """Drop thread state; threads do not survive fork(), so a child starts fresh"""
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+        self._threads = []
+        self._pid = None
+
+    def start(self):
+        """Start the worker threads in this process unless they are running"""
+        if self.workers <= 0 or (self._threads and self._pid == os.getpid()):
+            return
+        with self._start_lock:
+            if self._threads and self._pid == os.getpid():
+                return
+            self._stopping.clear()
+            self._pid = os.getpid()
+            self._threads = []
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'image-worker-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def enqueue(self, conn, kind, image_path):
+        """Queue a job inside the caller's write transaction; call notify() after commit"""
+        cursor = conn.execute(
+            'INSERT INTO image_jobs (kind, image_path) VALUES (?, ?)', (kind, image_path)
+        )
+        return cursor.lastrowid
+
+    def notify(self):
+        if self.workers <= 0:
+            self.run_pending()
+        else:
+            self._wakeup.set()
+
+    def run_pending(self):
+        """Process queued jobs on the calling thread until none are left"""
+        while True:
+            job = self._claim()
+            if job is None:
+                break
+            self._run(job)
+
+    def _work(self):
+        while not self._stopping.is_set():
+            try:
+                job = self._claim()
+            except Exception as e:
+                print(f"Warning: Could not claim image job: {e}")
+                job = None
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._run(job)
+
+    def _claim(self):
+        lease = (f'-{self.lease} seconds',)
+        # Idle workers poll often; only take the write lock when there is work
+        conn = db_pool.acquire()
+        try:
+            claimable = conn.execute(
+                f'SELECT EXISTS (SELECT 1 FROM image_jobs WHERE {CLAIMABLE_JOBS_SQL})', lease
+            ).fetchone()[0]
+        finally:
+            db_pool.release(conn)
+        if not claimable:
+            return None
+        
+        with db_write() as conn:
+            return conn.execute(f'''
+                UPDATE image_jobs
+                SET status = 'processing', attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE id = (
+                    SELECT id FROM image_jobs
+                    WHERE {CLAIMABLE_JOBS_SQL}
+                    ORDER BY id
+                    LIMIT 1
+                )
+                RETURNING id, kind, image_path, attempts
+            ''', lease).fetchone()
+
+    def _run(self, job):
+        process, tables, cache_namespaces = IMAGE_JOB_KINDS[job['kind']]
+        started = time.perf_counter()
+        try:
+            result = process(job['image_path'])
+        except Exception as e:
+            IMAGE_PROCESSING_SECONDS.observe(time.perf_counter() - started, kind=job['kind'], outcome='error')
+            print(f"Image processing failed for {job['image_path']}: {e}")
+            failed = job['attempts'] >= self.max_attempts
+            delay = self.retry_delay * 2 ** (job['attempts'] - 1)
+            with db_write() as conn:
+                conn.execute('''
+                    UPDATE image_jobs
+                    SET status = ?, error = ?, not_before = datetime('now', ?), updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                ''', ('failed' if failed else 'pending', str(e), f'+{delay} seconds', job['id']))
+                for table in tables if failed else ():
+                    conn.execute(
+                        f"UPDATE {table} SET processing_status = 'failed' WHERE {IMAGE_TABLES[table][1]} = ?",
+                        (job['image_path'],)
+                    )
+            return
+        
+        IMAGE_PROCESSING_SECONDS.observe(time.perf_counter() - started, kind=job['kind'], outcome='ok')
+        path = result.get('path', job['image_path'])
+        with db_write() as conn:
+            updated = 0
+            for table in tables:
+                path_column, path_sql, result_columns = IMAGE_TABLES[table]
+                columns = {column: result[column] for column in result_columns if column in result}
+                if path != job['image_path']:
+                    columns[path_column] = path
+                columns['processing_status'] = 'ready'
+                assignments = ', '.join(f'{column} = ?' for column in columns)
+                updated += conn.execute(
+                    f'UPDATE {table} SET {assignments} WHERE {path_sql} = ?',
+                    (*columns.values(), job['image_path'])
+                ).rowcount
+            if not updated:
+                # The image was deleted while it was being processed; drop
+                # what the job wrote before anyone can pick it up
+                remove_image_files(path, result.get('variants'))
+            if 'project_images' in tables:
+                conn.execute('''
+                    UPDATE projects SET updated_at = CURRENT_TIMESTAMP
+                    WHERE id IN (SELECT project_id FROM project_images WHERE image_path = ?)
+                ''', (path,))
+            conn.execute(
+                "UPDATE image_jobs SET status = 'done', error = NULL, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (job['id'],)
+            )
+            invalidate_cache(conn, *cache_namespaces)
+        if path != job['image_path']:
+            # Nothing refers to the oversized original any more
+            remove_image_files(job['image_path'])
+
+image_jobs = ImageJobQueue(
+    workers=app.config['IMAGE_WORKERS'],
+    lease=app.config['IMAGE_JOB_LEASE'],
+    max_attempts=app.config['IMAGE_JOB_MAX_ATTEMPTS'],
+    retry_delay=app.config['IMAGE_JOB_RETRY_DELAY']
+)
+
+def build_srcset(variants_json):
+    """Format stored variant metadata as an HTML srcset attribute value"""
+    if not variants_json:
+        return None
+    return ', '.join(
+        f"http://localhost:5001/uploads/{variant['path']} {variant['width']}w"
+        for variant in json.loads(variants_json)
+    )
+
+def remove_image_files(image_path, variants_json=None):
+    """Delete an uploaded image and any variants generated from it"""
+    paths = {image_path}
+    if variants_json:
+        paths.update(variant['path'] for variant in json.loads(variants_json))
+    paths.update(f"{path}.{fmt}" for path in list(paths) for fmt in MODERN_FORMATS)
+    for path in paths:
+        try:
+            file_path = os.path.join(app.config['UPLOAD_FOLDER'], path)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        except Exception as e:
+            print(f"Warning: Could not delete file {path}: {e}")
+
+# Content-addressed blob store
+BLOB_FOLDER = 'blobs'
+
+class UploadRejected(Exception):
+    """An upload refused while it was being streamed in"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+# Leading bytes of each accepted image format -> stored extension
+IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'GIF87a', '.gif'),
+    (b'GIF89a', '.gif')
+]
+IMAGE_SNIFF_BYTES = 12
+
+def sniff_image_type(header):
+    for signature, ext in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return ext
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return '.webp'
+    return None
+
+class IncomingImage:
+    """One file part of a streamed upload, hashed while written to disk.
+
+    The first bytes are held back until the format can be sniffed, so a
+    non-image part is refused before anything is written.
+    """
+
+    def __init__(self, original_name):
+        self.original_name = original_name
+        self.temp_path = os.path.join(UPLOAD_FOLDER, BLOB_FOLDER, 'tmp', uuid.uuid4().hex)
+        os.makedirs(os.path.dirname(self.temp_path), exist_ok=True)
+        self.ext = None
+        self.size = 0
+        self._header = b''
+        self._digest = hashlib.sha256()
+        self._file = open(self.temp_path, 'wb')
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > app.config['UPLOAD_MAX_FILE_SIZE']:
+            raise UploadRejected(
+                f"{self.original_name} is larger than {app.config['UPLOAD_MAX_FILE_SIZE']} bytes", 413
+            )
+        if self.ext is None:
+            self._header += data
+            if len(self._header) < IMAGE_SNIFF_BYTES:
+                return
+            data = self._sniff()
+        self._digest.update(data)
+        self._file.write(data)
+
+    def _sniff(self):
+        self.ext = sniff_image_type(self._header)
+        if self.ext is None:
+            raise UploadRejected(f"{self.original_name} is not a supported image", 415)
+        header, self._header = self._header, b''
+        return header
+
+    def finish(self):
+        """Close the file; returns (sha256 hex digest, temporary path, extension, original name)"""
+        if self.ext is None:
+            header = self._sniff()
+            self._digest.update(header)
+            self._file.write(header)
+        self._file.close()
+        return self._digest.hexdigest(), self.temp_path, self.ext, self.original_name
+
+    def discard(self):
+        self._file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+def receive_image_uploads(file_fields):
+    """Parse a multipart upload straight from the socket.
+
+    Image parts in file_fields are streamed chunk by chunk to temporary
+    files next to the blob store (so acquire_blob only has to rename them),
+    hashed as they go. Per-file, per-request and file-count limits are
+    checked while reading, and non-images are refused from their first
+    bytes. Returns (form fields, [(digest, temp_path, ext, original_name)]).
+    """
+    boundary = request.mimetype_params.get('boundary')
+    if request.mimetype != 'multipart/form-data' or not boundary:
+        raise UploadRejected('Expected a multipart/form-data upload')
+    
+    max_request_size = app.config['UPLOAD_MAX_REQUEST_SIZE']
+    if request.content_length is not None and request.content_length > max_request_size:
+        raise UploadRejected(f'Upload is larger than {max_request_size} bytes', 413)
+    
+    stream = get_input_stream(request.environ, max_content_length=max_request_size)
+    decoder = MultipartDecoder(
+        boundary.encode('latin-1'),
+        # Bounds the decoder's buffer, which holds form fields and the
+        # unparsed tail of the previous read, so it must exceed the read size
+        max_form_memory_size=1024 * 1024,
+        max_parts=app.config['UPLOAD_MAX_FILES'] + 16
+    )
+    fields = {}
+    files = []
+    part = None  # IncomingImage, [name, bytearray] for a form field, or None to skip
+    try:
+        while True:
+            chunk = stream.read(64 * 1024)
+            decoder.receive_data(chunk or None)
+            event = decoder.next_event()
+            while not isinstance(event, (NeedData, Epilogue)):
+                if isinstance(event, File):
+                    part = None
+                    if event.name in file_fields and event.filename and allowed_file(event.filename):
+                        if len(files) >= app.config['UPLOAD_MAX_FILES']:
+                            raise UploadRejected(
+                                f"At most {app.config['UPLOAD_MAX_FILES']} files can be uploaded at once", 413
+                            )
+                        part = IncomingImage(event.filename)
+                        files.append(part)
+                elif isinstance(event, Field):
+                    part = [event.name, bytearray()]
+                elif isinstance(event, Data):
+                    if isinstance(part, IncomingImage):
+                        part.write(event.data)
+                    elif part is not None:
+                        part[1] += event.data
+                        if not event.more_data:
+                            fields[part[0]] = part[1].decode('utf-8', 'replace')
+                event = decoder.next_event()
+            if isinstance(event, Epilogue) or not chunk:
+                break
+        
+        return fields, [incoming.finish() for incoming in files]
+    except RequestEntityTooLarge:
+        for incoming in files:
+            incoming.discard()
+        raise UploadRejected(f'Upload is larger than {max_request_size} bytes', 413)
+    except ValueError:
+        for incoming in files:
+            incoming.discard()
+        raise UploadRejected('Malformed multipart upload')
+    except BaseException:
+        for incoming in files:
+            incoming.discard()
+        raise
+
+def acquire_blob(conn, digest, temp_path, ext):
+    """Take a reference to the blob for an upload inside a write transaction.
+
+    A new blob is renamed into place under blobs/<ab>/<hash><ext> and needs
+    processing; for a known one the temporary file is discarded and the
+    existing row, with its variants, is reused. Returns (blob row, is_new).
+    """
+    blob = conn.execute('SELECT * FROM blobs WHERE hash = ?', (digest,)).fetchone()
+    if blob is not None:
+        conn.execute('UPDATE blobs SET refcount = refcount + 1 WHERE hash = ?', (digest,))
+        os.remove(temp_path)
+        return blob, False
+    
+    path = f"{BLOB_FOLDER}/{digest[:2]}/{digest}{ext}"
+    os.makedirs(os.path.join(UPLOAD_FOLDER, BLOB_FOLDER, digest[:2]), exist_ok=True)
+    os.replace(temp_path, os.path.join(UPLOAD_FOLDER, path))
+    blob = conn.execute(
+        'INSERT INTO blobs (hash, path) VALUES (?, ?) RETURNING *', (digest, path)
+    ).fetchone()
+    return blob, True
+
+def release_image(conn, image_path, variants_json=None):
+    """Drop one reference to an uploaded image inside a write transaction.
+
+    Blob files are unlinked together with their last reference, while the
+    write lock is still held so a concurrent upload of the same bytes cannot
+    lose its file. Images stored before the blob store have a single owner.
+    """
+    if not image_path.startswith(f"{BLOB_FOLDER}/"):
+        remove_image_files(image_path, variants_json)
+        return
+    
+    blob = conn.execute(
+        'UPDATE blobs SET refcount = refcount - 1 WHERE path = ? RETURNING hash, refcount, variants',
+        (image_path,)
+    ).fetchone()
+    if blob is None:
+        remove_image_files(image_path, variants_json)
+    elif blob['refcount'] <= 0:
+        conn.execute('DELETE FROM blobs WHERE hash = ?', (blob['hash'],))
+        remove_image_files(image_path, blob['variants'])
+
+class ConnectionPool:
+    """Bounded pool of reusable SQLite connections.
+
+    Each request borrows one connection for the lifetime of its app context and
+    hands it back on teardown, so the file handle and parsed schema are reused
+    instead of being rebuilt on every request. A connection is only checked
+    with a query before reuse when it sat idle longer than idle_check seconds
+    or was returned after an OperationalError.
+    """
+
+    def __init__(self, connect, size=8, timeout=5.0, idle_check=30.0):
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.idle_check = idle_check
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self):
+        """Borrow a connection, opening a new one while under the size limit"""
+        try:
+            conn, idle_since, suspect = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            try:
+                conn, idle_since, suspect = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise RuntimeError('Timed out waiting for a database connection')
+        
+        # Replace connections that went bad while sitting in the pool
+        if (suspect or time.monotonic() - idle_since > self.idle_check) and not self._is_healthy(conn):
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        return conn
+
+    def release(self, conn, suspect=False):
+        """Return a connection, discarding any uncommitted work.
+        
+        suspect marks a connection whose last use raised an OperationalError,
+        so it is checked before it is handed out again.
+        """
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        self._idle.put((conn, time.monotonic(), suspect))
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._opened -= 1
+
+    def reset(self):
+        """Forget connections inherited from a parent process without using them"""
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def close_all(self):
+        """Close every idle connection (used on shutdown)"""
+        while True:
+            try:
+                conn, _, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+db_pool = ConnectionPool(
+    connect_db,
+    size=app.config['DB_POOL_SIZE'],
+    timeout=app.config['DB_POOL_TIMEOUT'],
+    idle_check=app.config['DB_POOL_IDLE_CHECK']
+)
+
 def get_db_connection():
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Return the pooled connection bound to the current app context"""
+    if 'db' not in g:
+        g.db = db_pool.acquire()
+    return g.db
+
+@app.teardown_appcontext
+def release_db_connection(exception=None):
+    conn = g.pop('db', None)
+    if conn is not None:
+        db_pool.release(conn, suspect=isinstance(exception, sqlite3.OperationalError))
+
+class DatabaseWriter:
+    """Funnels every write through one dedicated, lock-protected connection.
+
+    Only one write transaction runs at a time in this process, and each one
+    takes SQLite's write lock up front (BEGIN IMMEDIATE), so concurrent admin
+    requests queue here instead of failing with "database is locked".
+    Other processes are covered by busy_timeout. Not reentrant.
+    """
+
+    def __init__(self, connect):
+        self._connect = connect
+        self._conn = None
+        self._lock = threading.Lock()
+        self._after_commit = []
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._connect()
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                self._after_commit.clear()
+                conn.rollback()
+                raise
+            else:
+                # No-op when the caller already rolled back
+                conn.commit()
+                callbacks, self._after_commit = self._after_commit, []
+                for callback in callbacks:
+                    callback()
+
+    def after_commit(self, callback):
+        """Run callback once the current transaction has committed"""
+        self._after_commit.append(callback)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def reset(self):
+        """Forget a connection inherited from a parent process without using it"""
+        self._conn = None
+        self._lock = threading.Lock()
+        self._after_commit = []
+
+db_writer = DatabaseWriter(connect_db)
+
+def db_write():
+    """Context manager yielding the writer connection inside a transaction"""
+    return db_writer.transaction()
+
+# Metrics
+def escape_label_value(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+class Metric:
+    """A Prometheus metric family with label sets as keys"""
+
+    def __init__(self, name, help_text, kind, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(label, '')) for label in self.labels)
+
+    def _format_labels(self, key, extra=()):
+        pairs = list(zip(self.labels, key)) + list(extra)
+        if not pairs:
+            return ''
+        escaped = (f'{name}="{escape_label_value(value)}"' for name, value in pairs)
+        return '{' + ','.join(escaped) + '}'
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f'{self.name}{self._format_labels(key)} {value}')
+        return lines
+
+class Counter(Metric):
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, 'counter', labels)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, 'gauge', labels)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, 'histogram', labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # Per-bucket counts (made cumulative on render), sum, count
+                series = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted((key, ([*counts], total, count)) for key, (counts, total, count) in self._values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{self._format_labels(key, [("le", repr(bound))])} {cumulative}')
+            lines.append(f'{self.name}_bucket{self._format_labels(key, [("le", "+Inf")])} {count}')
+            lines.append(f'{self.name}_sum{self._format_labels(key)} {total}')
+            lines.append(f'{self.name}_count{self._format_labels(key)} {count}')
+        return lines
+
+# Metrics are per process; with several workers each one is scraped separately
+HTTP_REQUESTS = Counter('http_requests_total', 'HTTP requests by endpoint, method and status.',
+                        ('endpoint', 'method', 'status'))
+HTTP_REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'Time spent handling HTTP requests.',
+                                 ('endpoint', 'method'))
+HTTP_REQUESTS_IN_FLIGHT = Gauge('http_requests_in_flight', 'HTTP requests currently being handled.')
+DB_QUERIES = Counter('db_queries_total', 'SQLite statements executed, by endpoint.', ('endpoint',))
+DB_QUERY_SECONDS = Counter('db_query_seconds_total', 'Time spent executing SQLite statements, by endpoint.',
+                           ('endpoint',))
+DB_QUERIES_PER_REQUEST = Histogram('db_queries_per_request', 'SQLite statements executed per request.',
+                                   ('endpoint',), buckets=(1, 2, 5, 10, 20, 50, 100))
+IMAGE_PROCESSING_SECONDS = Histogram('image_processing_duration_seconds', 'Time spent processing uploaded images.',
+                                     ('kind', 'outcome'), buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+RATE_LIMITED = Counter('rate_limited_requests_total', 'Requests refused by a rate limit, by route.', ('route',))
+LOGIN_ATTEMPTS = Counter('admin_login_attempts_total', 'Admin login attempts by outcome.', ('outcome',))
+METRICS = [HTTP_REQUESTS, HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT, DB_QUERIES, DB_QUERY_SECONDS,
+           DB_QUERIES_PER_REQUEST, IMAGE_PROCESSING_SECONDS, LOGIN_ATTEMPTS, RATE_LIMITED]
+
+# Statement count and time for the request (or background job) on this thread
+query_stats = threading.local()
+
+def record_query(conn, duration, sql, params=()):
+    query_stats.count = getattr(query_stats, 'count', 0) + 1
+    query_stats.seconds = getattr(query_stats, 'seconds', 0.0) + duration
+    
+    threshold = app.config['SLOW_QUERY_MS']
+    if threshold and duration * 1000 >= threshold:
+        log_slow_query(conn, duration, sql, params)
+
+def log_slow_query(conn, duration, sql, params):
+    """Print a slow statement together with its EXPLAIN QUERY PLAN"""
+    statement = ' '.join(sql.split())
+    try:
+        # A plain cursor, so explaining the statement is not itself timed
+        plan = sqlite3.Cursor(conn).execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+        plan_lines = [f"    {row[3]}" for row in plan]
+    except (sqlite3.Error, ValueError) as e:
+        plan_lines = [f"    (no plan: {e})"]
+    print('\n'.join([f"Slow query ({duration * 1000:.1f} ms): {statement} {list(params)}"] + plan_lines))
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that records how long each statement takes to execute"""
+
+    def execute(self, sql, params=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, params)
+        finally:
+            record_query(self.connection, time.perf_counter() - started, sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_params)
+        finally:
+            record_query(self.connection, time.perf_counter() - started, sql)
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors, including the execute() shortcut's, are instrumented"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    query_stats.count = 0
+    query_stats.seconds = 0.0
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    endpoint = request.endpoint or 'unmatched'
+    HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method)
+    count = getattr(query_stats, 'count', 0)
+    seconds = getattr(query_stats, 'seconds', 0.0)
+    if count:
+        DB_QUERIES.inc(count, endpoint=endpoint)
+        DB_QUERY_SECONDS.inc(seconds, endpoint=endpoint)
+    DB_QUERIES_PER_REQUEST.observe(count, endpoint=endpoint)
+    if app.config['SQL_SERVER_TIMING']:
+        response.headers.add('Server-Timing', f'db;desc="{count} queries";dur={seconds * 1000:.2f}')
+        response.headers.add('Server-Timing', f'app;dur={(time.perf_counter() - started) * 1000:.2f}')
+    return response
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    HTTP_REQUESTS_IN_FLIGHT.dec()
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Expose metrics in the Prometheus text format"""
+    token = app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return app.response_class('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+# Response compression
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html'}
+
+def choose_content_encoding(body_size):
+    """Best encoding the client accepts for a body of this size, or None"""
+    if body_size < app.config['COMPRESS_MIN_SIZE']:
+        return None
+    if brotli is not None and request.accept_encodings['br']:
+        return 'br'
+    if request.accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+def compress_body(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=app.config['COMPRESS_BROTLI_QUALITY'])
+    return gzip.compress(body, compresslevel=app.config['COMPRESS_GZIP_LEVEL'], mtime=0)
+
+@app.after_request
+def compress_response(response):
+    """Compress JSON and text responses the view did not already encode"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    encoding = choose_content_encoding(len(body))
+    if encoding is None:
+        return response
+    
+    response.set_data(compress_body(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    # A representation-specific validator, so caches never mix encodings
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+    return response
+
+# Response cache
+class CachedResponse:
+    """Serialized body of a public API response plus its validators.
+
+    Compressed copies of the body are made on first use and kept with the
+    entry, so each cached body is compressed at most once per encoding.
+    """
+
+    def __init__(self, body, mimetype, generation, expires_at, headers=None):
+        self.body = body
+        self.generation = generation
+        self.mimetype = mimetype
+        self.expires_at = expires_at
+        self.headers = headers or []
+        # Strong validator: any change to the serialized body changes the tag
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self._encoded = {}
+
+    def encoded(self, encoding):
+        body = self._encoded.get(encoding)
+        if body is None:
+            body = self._encoded[encoding] = compress_body(self.body, encoding)
+        return body
+
+class ResponseCache:
+    """LRU cache of serialized public API responses with a TTL.
+
+    Entries are grouped by namespace (one per public resource) and remember
+    the namespace's generation from cache_generations when they were built.
+    An entry is only served while that generation is current, so a write
+    that bumps it (see invalidate_cache) drops the copies held by every
+    worker process, not just the one that made the write. Generations are
+    re-read at most every check_interval seconds, so cache hits in between
+    don't touch the database; the writing process re-reads them right after
+    its commit.
+    """
+
+    def __init__(self, max_entries=256, ttl=300, check_interval=1.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._checked_at = None
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def generation(self, namespace, load):
+        """Current generation of namespace; load() reads all of them from the database"""
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return self._generations.get(namespace, 0)
+            epoch = self._epoch
+        generations = load()
+        with self._lock:
+            # Unless a local commit asked for a re-read meanwhile
+            if self._epoch == epoch:
+                self._generations = generations
+                self._checked_at = now
+        return generations.get(namespace, 0)
+
+    def expire_generations(self):
+        """Re-read generations on the next lookup"""
+        with self._lock:
+            self._checked_at = None
+            self._epoch += 1
+
+    def get(self, key, generation):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.generation != generation or entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, body, mimetype, generation, headers=None):
+        entry = CachedResponse(body, mimetype, generation, time.monotonic() + self.ttl, headers)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+response_cache = ResponseCache(
+    max_entries=app.config['RESPONSE_CACHE_MAX_ENTRIES'],
+    ttl=app.config['RESPONSE_CACHE_TTL'],
+    check_interval=app.config['RESPONSE_CACHE_CHECK_INTERVAL'] / 1000
+)
+
+CACHE_GENERATIONS_SQL = 'SELECT namespace, generation FROM cache_generations'
+
+def load_cache_generations():
+    return dict(get_db_connection().execute(CACHE_GENERATIONS_SQL).fetchall())
+
+def invalidate_cache(conn, *namespaces):
+    """Drop cached responses for namespaces in every process.
+
+    Call inside the db_write() transaction that changes the data, so the
+    new generation becomes visible together with it. Other processes notice
+    within RESPONSE_CACHE_CHECK_INTERVAL; this one as soon as it commits.
+    """
+    conn.executemany('''
+        INSERT INTO cache_generations (namespace, generation) VALUES (?, 1)
+        ON CONFLICT (namespace) DO UPDATE SET generation = generation + 1
+    ''', [(namespace,) for namespace in namespaces])
+    db_writer.after_commit(response_cache.expire_generations)
+
+def cached_response(namespace):
+    """Serve a public GET endpoint from the response cache.
+
+    Responses are keyed by path and query string. Only 200 responses are
+    stored, together with any X-* headers the view set; admin writes call
+    invalidate_cache(conn, namespace). Every response carries a strong ETag, and conditional requests that still
+    match it get a 304. There is deliberately no Last-Modified: timestamps
+    have one-second resolution and don't move on deletes, so
+    If-Modified-Since could confirm a stale copy. Bodies are sent
+    compressed from the entry's stored gzip/brotli copies.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = (namespace, request.full_path)
+            # Read before the view runs: a write committed in between leaves
+            # the new entry a generation behind, so it is rebuilt next time
+            generation = response_cache.generation(namespace, load_cache_generations)
+            entry = response_cache.get(key, generation)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                entry = response_cache.set(
+                    key, response.get_data(), response.mimetype, generation,
+                    headers=[(name, value) for name, value in response.headers if name.startswith('X-')]
+                )
+            
+            encoding = choose_content_encoding(len(entry.body))
+            if encoding is None:
+                response = app.response_class(entry.body, mimetype=entry.mimetype, headers=entry.headers)
+                response.set_etag(entry.etag)
+            else:
+                response = app.response_class(entry.encoded(encoding), mimetype=entry.mimetype, headers=entry.headers)
+                response.headers['Content-Encoding'] = encoding
+                response.set_etag(f"{entry.etag}-{encoding}")
+            response.vary.add('Accept-Encoding')
+            # Let browsers keep a copy but revalidate it on every use
+            response.cache_control.no_cache = True
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+# Rate limiting
+if app.config['PROXY_COUNT']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_COUNT'])
+
+def parse_rate(spec):
+    """'<requests>/<seconds>' -> (capacity, tokens added per second), or None"""
+    if not spec:
+        return None
+    count, _, seconds = spec.partition('/')
+    capacity = float(count)
+    return capacity, capacity / float(seconds or 1)
+
+def take_token(states, buckets, now):
+    """Token-bucket step shared by the rate limit stores.
+
+    states holds the stored (tokens, updated) of each (key, capacity, rate)
+    bucket, or None for one not seen yet. A token is only taken when every
+    bucket has one. Returns the new states and the seconds until the request
+    would be allowed (0 when it is).
+    """
+    levels = []
+    retry_after = 0.0
+    for state, (key, capacity, rate) in zip(states, buckets):
+        tokens = capacity if state is None else min(capacity, state[0] + (now - state[1]) * rate)
+        if tokens < 1:
+            retry_after = max(retry_after, (1 - tokens) / rate)
+        levels.append(tokens)
+    if not retry_after:
+        levels = [tokens - 1 for tokens in levels]
+    return [(tokens, now) for tokens in levels], retry_after
+
+class MemoryRateLimitStore:
+    """Buckets held in this process.
+
+    Past max_keys the least recently used bucket is dropped; it starts full
+    if that client comes back.
+    """
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self.reset()
+
+    def reset(self):
+        self._lock = threading.Lock()
+
+    def consume(self, buckets, now):
+        with self._lock:
+            states = [self._buckets.get(key) for key, _, _ in buckets]
+            states, retry_after = take_token(states, buckets, now)
+            for (key, _, _), state in zip(buckets, states):
+                self._buckets[key] = state
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+class SqliteRateLimitStore:
+    """Buckets in a small SQLite file shared by every worker on the host.
+
+    The file is separate from the site database and written with
+    synchronous=OFF, so throttling never waits on content writes. Losing
+    the last few updates in a crash only refills some buckets early.
+    """
+
+    # Buckets untouched this long are deleted (they have long since refilled)
+    IDLE_SECONDS = 3600
+
+    def __init__(self, path, prune_every=1000):
+        self.path = path
+        self.prune_every = prune_every
+        self.reset()
+
+    def reset(self):
+        """Forget connections inherited from a parent process"""
+        self._local = threading.local()
+        self._calls = 0
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = OFF')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS rate_limits '
+                '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+            self._local.conn = conn
+        return conn
+
+    def consume(self, buckets, now):
+        conn = self._connect()
+        keys = [key for key, _, _ in buckets]
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            stored = {
+                key: (tokens, updated) for key, tokens, updated in conn.execute(
+                    f"SELECT key, tokens, updated FROM rate_limits WHERE key IN ({','.join('?' * len(keys))})",
+                    keys
+                )
+            }
+            states, retry_after = take_token([stored.get(key) for key in keys], buckets, now)
+            conn.executemany(
+                'INSERT OR REPLACE INTO rate_limits (key, tokens, updated) VALUES (?, ?, ?)',
+                [(key, tokens, updated) for key, (tokens, updated) in zip(keys, states)]
+            )
+            self._calls += 1
+            if self._calls % self.prune_every == 0:
+                conn.execute('DELETE FROM rate_limits WHERE updated < ?', (now - self.IDLE_SECONDS,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return retry_after
+
+if app.config['RATE_LIMIT_BACKEND'] == 'sqlite':
+    rate_limit_store = SqliteRateLimitStore(app.config['RATE_LIMIT_DB'])
+else:
+    rate_limit_store = MemoryRateLimitStore(max_keys=app.config['RATE_LIMIT_MAX_KEYS'])
+
+def rate_limit(name):
+    """Throttle a route with the per-IP and global buckets in RATE_LIMITS[name].
+
+    Runs before the view, so a refused request never reaches the database;
+    it gets a 429 with Retry-After. If the shared store is unavailable the
+    request is let through rather than failed.
+    """
+    limits = app.config['RATE_LIMITS'].get(name, {})
+    per_ip = parse_rate(limits.get('ip'))
+    overall = parse_rate(limits.get('global'))
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            buckets = []
+            if per_ip:
+                buckets.append((f'{name}:ip:{request.remote_addr}',) + per_ip)
+            if overall:
+                buckets.append((f'{name}:global',) + overall)
+            if buckets:
+                try:
+                    retry_after = rate_limit_store.consume(buckets, time.time())
+                except sqlite3.Error as e:
+                    print(f"Warning: rate limit store unavailable ({e}); not throttling")
+                    retry_after = 0
+                if retry_after:
+                    RATE_LIMITED.inc(route=name)
+                    response = jsonify({'error': 'Too many requests, please try again later'})
+                    response.headers['Retry-After'] = str(math.ceil(retry_after))
+                    return response, 429
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# Password verification
+class LoginBusy(Exception):
+    """A login refused because password verification is at capacity"""
+
+def canonical_hash_method(method):
+    """Spell out werkzeug's defaults so methods compare as stored in hashes"""
+    parts = method.split(':')
+    if parts[0] == 'scrypt':
+        defaults = ['scrypt', str(2 ** 15), '8', '1']
+    elif parts[0] == 'pbkdf2':
+        defaults = ['pbkdf2', 'sha256', str(DEFAULT_PBKDF2_ITERATIONS)]
+    else:
+        return method
+    return ':'.join(parts + defaults[len(parts):])
+
+class PasswordVerifier:
+    """Checks passwords on a small thread pool of its own.
+
+    Password hashes are slow on purpose, so they are kept off the request
+    threads: at most `workers` run at once and `max_pending` more may wait.
+    A login arriving when both are full is refused with LoginBusy instead of
+    queueing behind the others.
+    """
+
+    def __init__(self, workers=2, max_pending=4, timeout=10, method='scrypt'):
+        self.workers = max(workers, 1)
+        self.max_pending = max(max_pending, 0)
+        self.timeout = timeout
+        self.method = canonical_hash_method(method)
+        self.reset()
+
+    def reset(self):
+        """Drop the pool; its threads do not survive fork(), so a child starts fresh"""
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                    thread_name_prefix='password-hash')
+            return self._executor
+
+    def needs_rehash(self, password_hash):
+        return password_hash.split('$', 1)[0] != self.method
+
+    def _check(self, password_hash, password):
+        if not check_password_hash(password_hash, password):
+            return False, None
+        if self.needs_rehash(password_hash):
+            return True, generate_password_hash(password, method=self.method)
+        return True, None
+
+    def verify(self, password_hash, password):
+        """Return (valid, new_hash); new_hash replaces an out-of-date stored hash"""
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise LoginBusy('Too many login attempts in progress')
+        try:
+            future = self._get_executor().submit(self._check, password_hash, password)
+        except BaseException:
+            slots.release()
+            raise
+        # The slot is held until the hash finishes, even if we stop waiting
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise LoginBusy('Password verification timed out')
+
+password_verifier = PasswordVerifier(
+    workers=app.config['LOGIN_HASH_WORKERS'],
+    max_pending=app.config['LOGIN_MAX_PENDING'],
+    timeout=app.config['LOGIN_TIMEOUT'],
+    method=app.config['LOGIN_HASH_METHOD']
+)
 
 # Admin Authentication Routes
 @app.route('/api/admin/login', methods=['POST'])
+@rate_limit('login')
 def admin_login():
     try:
         data = request.get_json()
@@ -198,92 +1988,303 @@ def admin_login():
         admin = conn.execute(
             'SELECT * FROM admins WHERE username = ?', (username,)
         ).fetchone()
-        conn.close()
+        # Don't hold a pooled connection while the hash runs
+        release_db_connection()
+        
+        valid = False
+        if admin and password:
+            valid, new_hash = password_verifier.verify(admin['password_hash'], password)
+            if new_hash:
+                with db_write() as conn:
+                    conn.execute(
+                        'UPDATE admins SET password_hash = ? WHERE id = ? AND password_hash = ?',
+                        (new_hash, admin['id'], admin['password_hash'])
+                    )
         
-        if admin and check_password_hash(admin['password_hash'], password):
+        if valid:
+            LOGIN_ATTEMPTS.inc(outcome='success')
             access_token = create_access_token(identity=username)
             return jsonify({
                 'access_token': access_token,
                 'username': username
             })
         else:
+            LOGIN_ATTEMPTS.inc(outcome='failure')
             return jsonify({'message': 'Invalid credentials'}), 401
             
+    except LoginBusy as e:
+        LOGIN_ATTEMPTS.inc(outcome='rejected')
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = str(app.config['LOGIN_RETRY_AFTER'])
+        return response, 429
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 # Projects Routes
+PROJECT_DETAIL_SQL = 'SELECT * FROM projects WHERE id = ? AND status = "active"'
+PROJECT_IMAGES_SQL = 'SELECT * FROM project_images WHERE project_id = ? ORDER BY is_main DESC, created_at'
+
+# Columns that can be requested through /api/projects?fields=
+PROJECT_COLUMNS = (
+    'id', 'title', 'description', 'category', 'location', 'size', 'year',
+    'featured', 'status', 'created_at', 'updated_at'
+)
+PROJECT_LIST_FIELDS = PROJECT_COLUMNS + ('image', 'main_image', 'srcset')
+
+def projects_filter(featured=False, category=None):
+    """WHERE clause shared by the project list and its total count"""
+    where = "p.status = 'active'"
+    params = []
+    
+    if featured:
+        where += ' AND p.featured = 1'
+    if category and category != 'all':
+        where += ' AND p.category = ?'
+        params.append(category)
+    
+    return where, params
+
+UPLOAD_URL_PREFIX = 'http://localhost:5001/uploads/'
+
+# SQL producing each list field as the API returns it, for json_object()
+PROJECT_LIST_FIELD_SQL = dict(
+    {column: f'p.{column}' for column in PROJECT_COLUMNS},
+    image=f"'{UPLOAD_URL_PREFIX}' || pi.image_path",
+    main_image=f"'{UPLOAD_URL_PREFIX}' || pi.image_path",
+    srcset=f'''(
+        SELECT group_concat('{UPLOAD_URL_PREFIX}' || json_extract(v.value, '$.path')
+                            || ' ' || json_extract(v.value, '$.width') || 'w', ', ')
+        FROM json_each(pi.variants) v
+    )'''
+)
+
+def build_projects_query(featured=False, category=None, limit=None, cursor=None, fields=None, as_json=False):
+    """Build the public project list query and its parameters.
+
+    cursor is a decoded (created_at, id) pair; rows strictly after it in list
+    order are returned. fields limits the selected columns (None means all),
+    and the main image join is skipped when no image field is requested.
+    With as_json, each row is (item, created_at, id) where item is the
+    finished JSON object, so the list can be sent without building dicts.
+    """
+    if as_json:
+        names = sorted(PROJECT_LIST_FIELDS if fields is None else set(fields))
+        pairs = ', '.join(f"'{name}', {PROJECT_LIST_FIELD_SQL[name]}" for name in names)
+        columns = f'json_object({pairs}) AS item, p.created_at, p.id'
+    elif fields is None:
+        columns = 'p.*'
+    else:
+        # id and created_at are always needed to build the next cursor
+        wanted = {'id', 'created_at'} | set(fields)
+        columns = ', '.join(f'p.{column}' for column in PROJECT_COLUMNS if column in wanted)
+    with_image = fields is None or bool({'image', 'main_image', 'srcset'} & set(fields))
+    
+    if with_image and as_json:
+        query = f'''
+        SELECT {columns}
+        FROM projects p
+        LEFT JOIN project_images pi ON p.id = pi.project_id AND pi.is_main = 1
+        '''
+    elif with_image:
+        query = f'''
+        SELECT {columns}, 
+               pi.image_path as main_image,
+               pi.variants as main_image_variants
+        FROM projects p
+        LEFT JOIN project_images pi ON p.id = pi.project_id AND pi.is_main = 1
+        '''
+    else:
+        query = f'''
+        SELECT {columns}
+        FROM projects p
+        '''
+    
+    where, params = projects_filter(featured, category)
+    query += f' WHERE {where}'
+    
+    if cursor:
+        query += ' AND (p.created_at, p.id) < (?, ?)'
+        params.extend(cursor)
+        
+    query += ' ORDER BY p.created_at DESC, p.id DESC'
+    
+    if limit:
+        query += ' LIMIT ?'
+        params.append(int(limit))
+    
+    return query, params
+
+def build_projects_count_query(featured=False, category=None):
+    """Count query for X-Total-Count; answered from the status indexes alone"""
+    where, params = projects_filter(featured, category)
+    return f'SELECT COUNT(*) FROM projects p WHERE {where}', params
+
+def encode_cursor(created_at, row_id):
+    raw = json.dumps([created_at, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def parse_page_size(value, default, maximum):
+    """Page size from a limit query argument, clamped to 1..maximum; raises ValueError"""
+    if value in (None, ''):
+        return default
+    try:
+        return max(1, min(int(value), maximum))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+
+def decode_cursor(cursor):
+    """Decode an opaque cursor into (created_at, id), or raise ValueError"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(created_at, str) or not isinstance(row_id, int):
+        raise ValueError('Invalid cursor')
+    return created_at, row_id
+
 @app.route('/api/projects', methods=['GET'])
+@cached_response('projects')
 def get_projects():
+    """List active projects, newest first.
+
+    Optional query parameters: featured, category, limit (page size, capped
+    at PROJECTS_MAX_PAGE_SIZE), cursor (from a previous X-Next-Cursor header)
+    and fields (comma separated subset of PROJECT_LIST_FIELDS). The total
+    number of matching projects is returned in X-Total-Count.
+    """
     try:
         featured = request.args.get('featured')
         limit = request.args.get('limit')
         category = request.args.get('category')
         
-        conn = get_db_connection()
-        query = '''
-            SELECT p.*, 
-                   pi.image_path as main_image
-            FROM projects p
-            LEFT JOIN project_images pi ON p.id = pi.project_id AND pi.is_main = 1
-            WHERE p.status = 'active'
-        '''
-        params = []
+        fields = None
+        if request.args.get('fields'):
+            fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+            unknown = [field for field in fields if field not in PROJECT_LIST_FIELDS]
+            if unknown:
+                return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
         
-        if featured:
-            query += ' AND p.featured = 1'
-        if category and category != 'all':
-            query += ' AND p.category = ?'
-            params.append(category)
-            
-        query += ' ORDER BY p.created_at DESC'
+        cursor = None
+        if request.args.get('cursor'):
+            try:
+                cursor = decode_cursor(request.args['cursor'])
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        try:
+            page_size = parse_page_size(limit, None, app.config['PROJECTS_MAX_PAGE_SIZE'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        if limit:
-            query += ' LIMIT ?'
-            params.append(int(limit))
+        conn = get_db_connection()
+        # Fetch one extra row to find out whether another page follows
+        # SQLite builds each JSON object, with image URLs and srcset, itself
+        query, params = build_projects_query(
+            featured, category, page_size + 1 if page_size else None, cursor, fields, as_json=True
+        )
         
         projects = conn.execute(query, params).fetchall()
-        conn.close()
+        has_more = page_size is not None and len(projects) > page_size
+        if has_more:
+            projects = projects[:page_size]
         
-        projects_list = []
-        for project in projects:
-            project_dict = dict(project)
-            # Convert relative path to full URL
-            if project_dict['main_image']:
-                project_dict['image'] = f"http://localhost:5001/uploads/{project_dict['main_image']}"
-                project_dict['main_image'] = f"http://localhost:5001/uploads/{project_dict['main_image']}"
+        count_query, count_params = build_projects_count_query(featured, category)
+        
+        response = json_array_response(project['item'] for project in projects)
+        response.headers['X-Total-Count'] = str(conn.execute(count_query, count_params).fetchone()[0])
+        if has_more:
+            last = projects[-1]
+            response.headers['X-Next-Cursor'] = encode_cursor(last['created_at'], last['id'])
+        return response
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/projects/search', methods=['GET'])
+@cached_response('projects')
+def search_projects():
+    """Full-text search over active projects (title, description, location)"""
+    try:
+        match = build_match_query(request.args.get('q'))
+        if not match:
+            return jsonify({'error': 'Search query is required'}), 400
+        try:
+            limit = parse_page_size(request.args.get('limit'), 20, app.config['PROJECTS_MAX_PAGE_SIZE'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        conn = get_db_connection()
+        if FTS5_AVAILABLE:
+            weights = ', '.join(str(weight) for weight in SEARCH_WEIGHTS['projects_fts'])
+            rows = conn.execute(f'''
+                SELECT p.*,
+                       pi.image_path as main_image,
+                       snippet(projects_fts, -1, '<mark>', '</mark>', '…', 12) as snippet,
+                       bm25(projects_fts, {weights}) as rank
+                FROM projects_fts
+                JOIN projects p ON p.id = projects_fts.rowid
+                LEFT JOIN project_images pi ON p.id = pi.project_id AND pi.is_main = 1
+                WHERE projects_fts MATCH ? AND p.status = 'active'
+                ORDER BY rank
+                LIMIT ?
+            ''', (match, limit)).fetchall()
+        else:
+            rows = search_with_like(conn, 'projects', request.args.get('q'),
+                                    "p.status = 'active'", [], limit)
+        
+        results = []
+        for row in rows:
+            result = dict(row)
+            if result['main_image']:
+                result['image'] = f"http://localhost:5001/uploads/{result['main_image']}"
+                result['main_image'] = result['image']
             else:
-                project_dict['image'] = None
-                project_dict['main_image'] = None
-            projects_list.append(project_dict)
+                result['image'] = None
+            results.append(result)
         
-        return jsonify(projects_list)
+        return jsonify(results)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def search_with_like(conn, table, text, condition, condition_params, limit):
+    """Fallback search for SQLite builds without FTS5 (full scan, no ranking)"""
+    columns = SEARCH_INDEXES[f'{table}_fts'][1]
+    terms = re.findall(r'\w+', text or '')[:SEARCH_MAX_TERMS]
+    clauses = []
+    params = list(condition_params)
+    for term in terms:
+        clauses.append('(' + ' OR '.join(f'p.{column} LIKE ?' for column in columns) + ')')
+        params.extend([f'%{term}%'] * len(columns))
+    join = ''
+    image_column = ''
+    if table == 'projects':
+        join = 'LEFT JOIN project_images pi ON p.id = pi.project_id AND pi.is_main = 1'
+        image_column = ', pi.image_path as main_image'
+    return conn.execute(f'''
+        SELECT p.*{image_column}, NULL as snippet, NULL as rank
+        FROM {table} p
+        {join}
+        WHERE {condition} AND {' AND '.join(clauses)}
+        ORDER BY p.created_at DESC
+        LIMIT ?
+    ''', params + [limit]).fetchall()
+
 @app.route('/api/projects/<int:project_id>', methods=['GET'])
+@cached_response('projects')
 def get_project(project_id):
     try:
         conn = get_db_connection()
         
         # Get project details
-        project = conn.execute(
-            'SELECT * FROM projects WHERE id = ? AND status = "active"',
-            (project_id,)
-        ).fetchone()
+        project = conn.execute(PROJECT_DETAIL_SQL, (project_id,)).fetchone()
         
         if not project:
-            conn.close()
             return jsonify({'message': 'Project not found'}), 404
         
         # Get project images
-        images = conn.execute(
-            'SELECT * FROM project_images WHERE project_id = ? ORDER BY is_main DESC, created_at',
-            (project_id,)
-        ).fetchall()
-        
-        conn.close()
+        images = conn.execute(PROJECT_IMAGES_SQL, (project_id,)).fetchall()
         
         project_dict = dict(project)
         
@@ -291,17 +2292,26 @@ def get_project(project_id):
         images_with_urls = []
         main_image_url = None
         
+        main_image_srcset = None
+        
         for img in images:
             img_dict = dict(img)
             img_dict['url'] = f"http://localhost:5001/uploads/{img_dict['image_path']}"
+            img_dict['srcset'] = build_srcset(img_dict['variants'])
+            img_dict['variants'] = [
+                dict(variant, url=f"http://localhost:5001/uploads/{variant['path']}")
+                for variant in json.loads(img_dict['variants'] or '[]')
+            ]
             images_with_urls.append(img_dict)
             
             # Set main image URL
             if img_dict['is_main']:
                 main_image_url = img_dict['url']
+                main_image_srcset = img_dict['srcset']
         
         project_dict['images'] = images_with_urls
         project_dict['main_image'] = main_image_url
+        project_dict['main_image_srcset'] = main_image_srcset
         
         return jsonify(project_dict)
         
@@ -314,25 +2324,25 @@ def create_project():
     try:
         data = request.get_json()
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO projects (title, description, category, location, size, year, featured)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data.get('title'),
-            data.get('description'),
-            data.get('category'),
-            data.get('location'),
-            data.get('size'),
-            data.get('year'),
-            data.get('featured', False)
-        ))
-        
-        project_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with db_write() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                INSERT INTO projects (title, description, category, location, size, year, featured)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                data.get('title'),
+                data.get('description'),
+                data.get('category'),
+                data.get('location'),
+                data.get('size'),
+                data.get('year'),
+                data.get('featured', False)
+            ))
+            
+            project_id = cursor.lastrowid
+            
+            invalidate_cache(conn, 'projects')
         
         return jsonify({
             'message': 'Project created successfully',
@@ -349,30 +2359,28 @@ def update_project(project_id):
     try:
         data = request.get_json()
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE projects 
-            SET title = ?, description = ?, category = ?, location = ?, size = ?, year = ?, featured = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (
-            data.get('title'),
-            data.get('description'),
-            data.get('category'),
-            data.get('location'),
-            data.get('size'),
-            data.get('year'),
-            data.get('featured', False),
-            project_id
-        ))
-        
-        if cursor.rowcount == 0:
-            conn.close()
-            return jsonify({'error': 'Project not found'}), 404
-        
-        conn.commit()
-        conn.close()
+        with db_write() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                UPDATE projects 
+                SET title = ?, description = ?, category = ?, location = ?, size = ?, year = ?, featured = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (
+                data.get('title'),
+                data.get('description'),
+                data.get('category'),
+                data.get('location'),
+                data.get('size'),
+                data.get('year'),
+                data.get('featured', False),
+                project_id
+            ))
+            
+            if cursor.rowcount == 0:
+                return jsonify({'error': 'Project not found'}), 404
+            
+            invalidate_cache(conn, 'projects')
         
         return jsonify({'message': 'Project updated successfully'}), 200
         
@@ -384,113 +2392,103 @@ def update_project(project_id):
 def delete_project(project_id):
     """Delete a project and all its associated images"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get all images for this project
-        cursor.execute('SELECT image_path FROM project_images WHERE project_id = ?', (project_id,))
-        images = cursor.fetchall()
-        
-        # Delete all project images from filesystem
-        for image in images:
-            try:
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], image[0])
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-            except Exception as e:
-                print(f"Warning: Could not delete file {image[0]}: {e}")
-        
-        # Delete project images from database
-        cursor.execute('DELETE FROM project_images WHERE project_id = ?', (project_id,))
-        
-        # Delete project
-        cursor.execute('DELETE FROM projects WHERE id = ?', (project_id,))
-        
-        if cursor.rowcount == 0:
-            conn.rollback()
-            conn.close()
-            return jsonify({'error': 'Project not found'}), 404
-        
-        conn.commit()
-        conn.close()
+        with db_write() as conn:
+            cursor = conn.cursor()
+            
+            # Delete project
+            cursor.execute('DELETE FROM projects WHERE id = ?', (project_id,))
+            
+            if cursor.rowcount == 0:
+                conn.rollback()
+                return jsonify({'error': 'Project not found'}), 404
+            
+            # Delete project images, and their files once no one else uses them
+            cursor.execute('SELECT image_path, variants FROM project_images WHERE project_id = ?', (project_id,))
+            images = cursor.fetchall()
+            cursor.execute('DELETE FROM project_images WHERE project_id = ?', (project_id,))
+            for image in images:
+                release_image(conn, image[0], image[1])
+            
+            invalidate_cache(conn, 'projects')
         
         return jsonify({'message': 'Project deleted successfully'}), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def touch_project(conn, project_id):
+    """Bump updated_at so it reflects changes to the project's images"""
+    conn.execute('UPDATE projects SET updated_at = CURRENT_TIMESTAMP WHERE id = ?', (project_id,))
+
 @app.route('/api/admin/projects/<int:project_id>/upload', methods=['POST'])
 @jwt_required()
 def upload_project_images(project_id):
     try:
-        
-        if 'files' not in request.files:
+        # Stream files to disk before taking the write lock; resizing happens in the background
+        fields, saved_files = receive_image_uploads({'files'})
+        if not saved_files:
             return jsonify({'error': 'No files uploaded'}), 400
         
-        files = request.files.getlist('files')
-        is_main = request.form.get('is_main', 'false').lower() == 'true'
+        is_main = fields.get('is_main', 'false').lower() == 'true'
         
         uploaded_files = []
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if project has any existing main image
-        existing_main = cursor.execute(
-            'SELECT COUNT(*) FROM project_images WHERE project_id = ? AND is_main = 1',
-            (project_id,)
-        ).fetchone()[0]
-        
-        has_main_image = existing_main > 0
-        first_upload = True  # Track if this is the first file being uploaded
-        
-        for file in files:
-            if file and file.filename and allowed_file(file.filename):
-                # Generate unique filename
-                filename = f"{uuid.uuid4()}_{secure_filename(file.filename)}"
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], 'projects', filename)
-                
-                # Save file
-                file.save(file_path)
-                
-                # Optimize image
-                try:
-                    with Image.open(file_path) as img:
-                        # Resize if too large
-                        if img.width > 1920 or img.height > 1080:
-                            img.thumbnail((1920, 1080), Image.Resampling.LANCZOS)
-                            img.save(file_path, optimize=True, quality=85)
-                except Exception as e:
-                    print(f"Image optimization failed: {e}")
-                
+        with db_write() as conn:
+            cursor = conn.cursor()
+            
+            # Check if project has any existing main image
+            existing_main = cursor.execute(
+                'SELECT COUNT(*) FROM project_images WHERE project_id = ? AND is_main = 1',
+                (project_id,)
+            ).fetchone()[0]
+            
+            has_main_image = existing_main > 0
+            first_upload = True  # Track if this is the first file being uploaded
+            
+            for digest, temp_path, ext, original_name in saved_files:
                 # Determine if this should be the main image
                 should_be_main = is_main or (not has_main_image and first_upload)
                 
+                # Identical bytes share one blob, processed only once
+                blob, is_new = acquire_blob(conn, digest, temp_path, ext)
+                job_id = image_jobs.enqueue(conn, 'blob', blob['path']) if is_new else None
+                
                 # Save to database
                 cursor.execute('''
-                    INSERT INTO project_images (project_id, image_path, image_name, is_main)
-                    VALUES (?, ?, ?, ?)
-                ''', (project_id, f"projects/{filename}", file.filename, should_be_main))
+                    INSERT INTO project_images
+                        (project_id, image_path, image_name, is_main, width, height, variants, processing_status)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (project_id, blob['path'], original_name, should_be_main,
+                      blob['width'], blob['height'], blob['variants'], blob['processing_status']))
+                image_id = cursor.lastrowid
                 
                 uploaded_files.append({
-                    'filename': filename,
-                    'original_name': file.filename,
-                    'path': f"projects/{filename}",
-                    'is_main': should_be_main
+                    'id': image_id,
+                    'job_id': job_id,
+                    'filename': os.path.basename(blob['path']),
+                    'original_name': original_name,
+                    'path': blob['path'],
+                    'is_main': should_be_main,
+                    'status': blob['processing_status']
                 })
                 
                 # After setting the first image as main, don't set subsequent ones as main
                 if should_be_main:
                     has_main_image = True
                 first_upload = False
+            
+            touch_project(conn, project_id)
+            
+            invalidate_cache(conn, 'projects')
         
-        conn.commit()
-        conn.close()
+        image_jobs.notify()
         
         return jsonify({
             'message': f'{len(uploaded_files)} files uploaded successfully',
             'files': uploaded_files
-        })
+        }), 202
         
+    except UploadRejected as e:
+        return jsonify({'error': str(e)}), e.status
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -503,14 +2501,13 @@ def get_project_images(project_id):
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT id, image_path, image_name, is_main, created_at
+            SELECT id, image_path, image_name, is_main, created_at, variants, processing_status
             FROM project_images 
             WHERE project_id = ? 
             ORDER BY is_main DESC, created_at
         ''', (project_id,))
         
         images = cursor.fetchall()
-        conn.close()
         
         image_list = []
         for img in images:
@@ -520,7 +2517,9 @@ def get_project_images(project_id):
                 'path': img[1],
                 'name': img[2],
                 'is_main': bool(img[3]),
-                'created_at': img[4]
+                'created_at': img[4],
+                'srcset': build_srcset(img[5]),
+                'status': img[6]
             })
         
         return jsonify({'images': image_list})
@@ -528,108 +2527,572 @@ def get_project_images(project_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/admin/image-jobs', methods=['GET'])
+@jwt_required()
+def get_image_jobs():
+    """Report image processing progress.
+
+    With ?ids=1,2,3 returns those jobs; otherwise the 50 most recent jobs
+    that are not done yet. The summary counts every job by status.
+    """
+    try:
+        try:
+            ids = [int(job_id) for job_id in request.args.get('ids', '').split(',') if job_id.strip()]
+        except ValueError:
+            return jsonify({'error': 'ids must be a comma separated list of integers'}), 400
+        
+        conn = get_db_connection()
+        if ids:
+            placeholders = ', '.join('?' for _ in ids)
+            rows = conn.execute(
+                f'SELECT * FROM image_jobs WHERE id IN ({placeholders}) ORDER BY id', ids
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT * FROM image_jobs WHERE status != 'done' ORDER BY id DESC LIMIT 50"
+            ).fetchall()
+        
+        summary = {'pending': 0, 'processing': 0, 'done': 0, 'failed': 0}
+        for row in conn.execute('SELECT status, COUNT(*) FROM image_jobs GROUP BY status').fetchall():
+            summary[row[0]] = row[1]
+        
+        return jsonify({'summary': summary, 'jobs': [dict(row) for row in rows]})
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/image-jobs/reprocess', methods=['POST'])
+@jwt_required()
+def reprocess_images():
+    """Queue every stored image for processing again, e.g. to backfill new formats"""
+    try:
+        with db_write() as conn:
+            blobs = conn.execute('SELECT path FROM blobs').fetchall()
+            # Images stored before the blob store are processed per row
+            project_images = conn.execute(
+                "SELECT image_path FROM project_images WHERE image_path NOT LIKE ?", (f'{BLOB_FOLDER}/%',)
+            ).fetchall()
+            hero_images = conn.execute(
+                "SELECT filename FROM hero_images WHERE filename NOT LIKE ?", (f'{BLOB_FOLDER}/%',)
+            ).fetchall()
+            for blob in blobs:
+                image_jobs.enqueue(conn, 'blob', blob['path'])
+            for image in project_images:
+                image_jobs.enqueue(conn, 'project_image', image['image_path'])
+            for image in hero_images:
+                image_jobs.enqueue(conn, 'hero_image', hero_image_path(image['filename']))
+        
+        image_jobs.notify()
+        
+        return jsonify({
+            'message': f'{len(blobs) + len(project_images) + len(hero_images)} image(s) queued for processing'
+        }), 202
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/admin/projects/<int:project_id>/images/<int:image_id>', methods=['DELETE'])
 @jwt_required()
 def delete_project_image(project_id, image_id):
     """Delete a specific project image"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with db_write() as conn:
+            cursor = conn.cursor()
+            
+            # Get image path before deleting
+            cursor.execute('SELECT image_path, variants FROM project_images WHERE id = ? AND project_id = ?', 
+                          (image_id, project_id))
+            image = cursor.fetchone()
+            
+            if not image:
+                return jsonify({'error': 'Image not found'}), 404
+            
+            # Delete from database
+            cursor.execute('DELETE FROM project_images WHERE id = ? AND project_id = ?', 
+                          (image_id, project_id))
+            touch_project(conn, project_id)
+            
+            # Delete file and its variants unless another image shares them
+            release_image(conn, image[0], image[1])
+            
+            invalidate_cache(conn, 'projects')
         
-        # Get image path before deleting
-        cursor.execute('SELECT image_path FROM project_images WHERE id = ? AND project_id = ?', 
-                      (image_id, project_id))
-        image = cursor.fetchone()
+        return jsonify({'message': 'Image deleted successfully'})
         
-        if not image:
-            return jsonify({'error': 'Image not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/projects/<int:project_id>/images/<int:image_id>/main', methods=['PUT'])
+@jwt_required()
+def set_main_project_image(project_id, image_id):
+    """Set an image as the main image for a project"""
+    try:
+        with db_write() as conn:
+            cursor = conn.cursor()
+            
+            # First, unset all main images for this project
+            cursor.execute('UPDATE project_images SET is_main = 0 WHERE project_id = ?', (project_id,))
+            
+            # Set the specified image as main
+            cursor.execute('UPDATE project_images SET is_main = 1 WHERE id = ? AND project_id = ?', 
+                          (image_id, project_id))
+            
+            if cursor.rowcount == 0:
+                conn.rollback()
+                return jsonify({'error': 'Image not found'}), 404
+            
+            touch_project(conn, project_id)
+            
+            invalidate_cache(conn, 'projects')
         
-        # Delete from database
-        cursor.execute('DELETE FROM project_images WHERE id = ? AND project_id = ?', 
-                      (image_id, project_id))
-        conn.commit()
-        conn.close()
+        return jsonify({'message': 'Main image updated successfully'})
         
-        # Delete file from filesystem
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Contact submission buffer
+CONTACT_INSERT_SQL = '''
+    INSERT OR IGNORE INTO contacts (submission_id, name, email, phone, company, message, created_at)
+    VALUES (:submission_id, :name, :email, :phone, :company, :message, :created_at)
+'''
+CONTACT_SPOOL_RE = re.compile(r'^contacts-(\d+)-[0-9a-f]+\.jsonl$')
+CONTACT_DEAD_LETTER = 'dead-letter.jsonl'
+CONTACT_FIELDS = ('name', 'email', 'phone', 'company', 'message')
+
+def fsync_directory(path):
+    """Make a file just created in path survive a crash (no-op on Windows)"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class ContactBuffer:
+    """Write-behind buffer for contact form submissions.
+
+    A submission is appended to this process's spool file and fsynced
+    before it is acknowledged (concurrent submitters share one fsync). A
+    flusher thread then moves spooled rows into contacts in a single
+    transaction every `interval` seconds, or sooner once `batch_size` are
+    waiting. Spool files left behind by a process that died are replayed by
+    the next one to start; submission_id is unique, so replaying a row that
+    already made it into the table is harmless. A row the database rejects
+    is moved to dead-letter.jsonl in the spool directory instead of holding
+    up the rest of its file. With interval <= 0 each submission is inserted
+    directly.
+    """
+
+    def __init__(self, spool_dir, interval=0.2, batch_size=100):
+        self.spool_dir = spool_dir
+        self.interval = interval
+        self.batch_size = batch_size
+        self.reset()
+
+    def reset(self):
+        """Drop the spool file and thread inherited from a parent process"""
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._file = None
+        self._owned = set()
+        self._retry = []
+        self._pending = 0
+        self._written = 0
+        self._synced = 0
+        self._thread = None
+        self._pid = None
+
+    def start(self):
+        """Start the flusher thread in this process unless it is running"""
+        if self.interval <= 0 or (self._thread and self._pid == os.getpid()):
+            return
+        with self._start_lock:
+            if self._thread and self._pid == os.getpid():
+                return
+            self._stopping.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._work, name='contact-flusher', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the flusher after writing out everything spooled so far"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, record):
+        """Durably accept a submission; returns once it is spooled (or inserted)"""
+        if self.interval <= 0:
+            with db_write() as conn:
+                conn.execute(CONTACT_INSERT_SQL, record)
+            return
+        line = json.dumps(record) + '\n'
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+            self._file.write(line)
+            self._file.flush()
+            self._written += 1
+            seq = self._written
+            self._pending += 1
+            pending = self._pending
+        self._sync(seq)
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def _open_segment(self):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        name = f'contacts-{os.getpid()}-{uuid.uuid4().hex[:12]}.jsonl'
+        self._owned.add(name)
+        self._file = open(os.path.join(self.spool_dir, name), 'a', encoding='utf-8')
+        fsync_directory(self.spool_dir)
+
+    def _sync(self, seq):
+        """fsync the spool until it covers write number seq"""
+        with self._sync_lock:
+            if self._synced >= seq:
+                return
+            with self._lock:
+                target = self._written
+                fd = self._file.fileno()
+            # Writers keep appending meanwhile; the next waiter syncs those
+            os.fsync(fd)
+            self._synced = target
+
+    def _rotate(self):
+        """Close the active spool file and return its name, or None"""
+        with self._sync_lock:
+            with self._lock:
+                if self._file is None:
+                    return None
+                spool, self._file = self._file, None
+                self._pending = 0
+                written = self._written
+            os.fsync(spool.fileno())
+            spool.close()
+            self._synced = written
+        return os.path.basename(spool.name)
+
+    def flush(self):
+        """Write spooled submissions to the database"""
+        name = self._rotate()
+        names, self._retry = self._retry + ([name] if name else []), []
+        for name in names:
+            try:
+                self._load(name)
+                self._owned.discard(name)
+            except Exception as e:
+                print(f"Warning: could not write spooled contacts from {name} ({e}); will retry")
+                self._retry.append(name)
+
+    def replay(self):
+        """Load spool files left by processes that are no longer running"""
+        if not os.path.isdir(self.spool_dir):
+            return
+        for name in sorted(os.listdir(self.spool_dir)):
+            match = CONTACT_SPOOL_RE.match(name)
+            if not match or name in self._owned:
+                continue
+            pid = int(match.group(1))
+            if pid != os.getpid() and pid_alive(pid):
+                continue
+            try:
+                self._load(name)
+            except Exception as e:
+                print(f"Warning: could not replay spooled contacts from {name} ({e})")
+
+    def _load(self, name):
+        path = os.path.join(self.spool_dir, name)
         try:
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], image[0])
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        except Exception as e:
-            print(f"Warning: Could not delete file {image[0]}: {e}")
+            with open(path, encoding='utf-8') as spool:
+                lines = spool.readlines()
+        except FileNotFoundError:
+            # Another process replayed it first
+            return
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # A write cut short by a crash, never acknowledged
+                print(f"Warning: skipping a truncated line in {name}")
+        if records:
+            try:
+                with db_write() as conn:
+                    conn.executemany(CONTACT_INSERT_SQL, records)
+            except sqlite3.OperationalError:
+                # The database is unavailable; flush() retries the segment
+                raise
+            except sqlite3.Error:
+                # Keep the good rows rather than retrying the batch forever
+                for record in records:
+                    try:
+                        with db_write() as conn:
+                            conn.execute(CONTACT_INSERT_SQL, record)
+                    except sqlite3.OperationalError:
+                        raise
+                    except sqlite3.Error as e:
+                        self._dead_letter(record, e)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _dead_letter(self, record, error):
+        """Set aside a record the database refuses so the rest of its segment loads"""
+        print(f"Warning: moving spooled contact {record.get('submission_id')} to {CONTACT_DEAD_LETTER} ({error})")
+        with open(os.path.join(self.spool_dir, CONTACT_DEAD_LETTER), 'a', encoding='utf-8') as dead:
+            dead.write(json.dumps({'record': record, 'error': str(error)}) + '\n')
+            dead.flush()
+            os.fsync(dead.fileno())
+
+    def _work(self):
+        self.replay()
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
+        self.flush()
+
+contact_buffer = ContactBuffer(
+    app.config['CONTACT_SPOOL_DIR'],
+    interval=app.config['CONTACT_FLUSH_INTERVAL'] / 1000,
+    batch_size=app.config['CONTACT_FLUSH_ROWS']
+)
+
+# Contact Routes
+@app.route('/api/contact', methods=['POST'])
+@rate_limit('contact')
+def submit_contact():
+    try:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
         
-        return jsonify({'message': 'Image deleted successfully'})
+        record = {field: data.get(field) for field in CONTACT_FIELDS}
+        # Anything else would be acknowledged now and refused by SQLite at flush time
+        if any(value is not None and not isinstance(value, str) for value in record.values()):
+            return jsonify({'error': 'Contact fields must be strings'}), 400
+        if not record['name'] or not record['email']:
+            return jsonify({'error': 'Name and email are required'}), 400
+        
+        record['submission_id'] = uuid.uuid4().hex
+        record['created_at'] = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        contact_buffer.submit(record)
+        
+        return jsonify({
+            'message': 'Contact form submitted successfully',
+            'submission_id': record['submission_id']
+        }), 201
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/admin/projects/<int:project_id>/images/<int:image_id>/main', methods=['PUT'])
+CONTACT_STATUSES = ('new', 'replied', 'archived')
+
+def parse_date_filter(value, end=False):
+    """'YYYY-MM-DD' or an ISO timestamp -> a created_at bound (UTC).
+    
+    A bare date used as an end bound covers that whole day.
+    """
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'Invalid date: {value}')
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    if end and len(value) == 10:
+        moment += timedelta(days=1)
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+def contact_filters(args):
+    """Read status, since, until and q from query args; raises ValueError"""
+    status = args.get('status')
+    if status in (None, '', 'all'):
+        status = None
+    elif status not in CONTACT_STATUSES:
+        raise ValueError('Invalid status')
+    return {
+        'status': status,
+        'since': parse_date_filter(args['since']) if args.get('since') else None,
+        'until': parse_date_filter(args['until'], end=True) if args.get('until') else None,
+        'q': args.get('q') or None
+    }
+
+def contacts_filter(status=None, since=None, until=None, q=None):
+    """WHERE clause shared by the admin contact list, its counts and exports.
+    
+    since is inclusive and until exclusive. q matches like the contact search
+    (every word as a prefix) but keeps the list in date order.
+    """
+    clauses = ['1 = 1']
+    params = []
+    
+    if status:
+        clauses.append('p.status = ?')
+        params.append(status)
+    if since:
+        clauses.append('p.created_at >= ?')
+        params.append(since)
+    if until:
+        clauses.append('p.created_at < ?')
+        params.append(until)
+    if q:
+        if FTS5_AVAILABLE:
+            match = build_match_query(q)
+            if match:
+                clauses.append('p.id IN (SELECT rowid FROM contacts_fts WHERE contacts_fts MATCH ?)')
+                params.append(match)
+        else:
+            columns = SEARCH_INDEXES['contacts_fts'][1]
+            for term in re.findall(r'\w+', q)[:SEARCH_MAX_TERMS]:
+                clauses.append('(' + ' OR '.join(f'p.{column} LIKE ?' for column in columns) + ')')
+                params.extend([f'%{term}%'] * len(columns))
+    
+    return ' AND '.join(clauses), params
+
+def build_contacts_query(filters=None, limit=None, cursor=None):
+    """Admin contact list query, newest first; cursor is a decoded (created_at, id)"""
+    where, params = contacts_filter(**(filters or {}))
+    query = f'SELECT p.* FROM contacts p WHERE {where}'
+    
+    if cursor:
+        query += ' AND (p.created_at, p.id) < (?, ?)'
+        params.extend(cursor)
+    
+    query += ' ORDER BY p.created_at DESC, p.id DESC'
+    
+    if limit:
+        query += ' LIMIT ?'
+        params.append(int(limit))
+    
+    return query, params
+
+def build_contact_counts_query(filters=None):
+    """Per-status counts for the list filters other than status"""
+    filters = dict(filters or {}, status=None)
+    where, params = contacts_filter(**filters)
+    return f'SELECT p.status, COUNT(*) AS count FROM contacts p WHERE {where} GROUP BY p.status', params
+
+@app.route('/api/admin/contacts', methods=['GET'])
 @jwt_required()
-def set_main_project_image(project_id, image_id):
-    """Set an image as the main image for a project"""
+def get_contacts():
+    """List contact submissions, newest first.
+    
+    Optional query parameters: status, since and until (dates or ISO
+    timestamps), q (text search), limit (page size, default
+    CONTACTS_PAGE_SIZE, capped at CONTACTS_MAX_PAGE_SIZE) and cursor (from a
+    previous X-Next-Cursor header). The number of matching contacts is
+    returned in X-Total-Count.
+    """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # First, unset all main images for this project
-        cursor.execute('UPDATE project_images SET is_main = 0 WHERE project_id = ?', (project_id,))
-        
-        # Set the specified image as main
-        cursor.execute('UPDATE project_images SET is_main = 1 WHERE id = ? AND project_id = ?', 
-                      (image_id, project_id))
-        
-        if cursor.rowcount == 0:
-            conn.rollback()
-            conn.close()
-            return jsonify({'error': 'Image not found'}), 404
-        
-        conn.commit()
-        conn.close()
-        
-        return jsonify({'message': 'Main image updated successfully'})
+        try:
+            filters = contact_filters(request.args)
+            cursor = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+            page_size = parse_page_size(
+                request.args.get('limit'), app.config['CONTACTS_PAGE_SIZE'], app.config['CONTACTS_MAX_PAGE_SIZE']
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
+        conn = get_db_connection()
+        # Fetch one extra row to find out whether another page follows
+        query, params = build_contacts_query(filters, page_size + 1, cursor)
+        contacts = conn.execute(query, params).fetchall()
+        has_more = len(contacts) > page_size
+        if has_more:
+            contacts = contacts[:page_size]
+        
+        where, count_params = contacts_filter(**filters)
+        total = conn.execute(f'SELECT COUNT(*) FROM contacts p WHERE {where}', count_params).fetchone()[0]
+        
+        response = jsonify([dict(contact) for contact in contacts])
+        response.headers['X-Total-Count'] = str(total)
+        if has_more:
+            last = contacts[-1]
+            response.headers['X-Next-Cursor'] = encode_cursor(last['created_at'], last['id'])
+        return response
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-# Contact Routes
-@app.route('/api/contact', methods=['POST'])
-def submit_contact():
+@app.route('/api/admin/contacts/counts', methods=['GET'])
+@jwt_required()
+def get_contact_counts():
+    """Number of contacts per status (and in total) matching since, until and q"""
     try:
-        data = request.get_json()
+        try:
+            filters = contact_filters(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO contacts (name, email, phone, company, message)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
-            data.get('name'),
-            data.get('email'),
-            data.get('phone'),
-            data.get('company'),
-            data.get('message')
-        ))
-        
-        conn.commit()
-        conn.close()
-        
-        return jsonify({'message': 'Contact form submitted successfully'}), 201
-        
+        counts = {status: 0 for status in CONTACT_STATUSES}
+        query, params = build_contact_counts_query(filters)
+        total = 0
+        for row in conn.execute(query, params).fetchall():
+            total += row['count']
+            if row['status'] in counts:
+                counts[row['status']] = row['count']
+        counts['total'] = total
+        
+        return jsonify(counts)
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/admin/contacts', methods=['GET'])
+@app.route('/api/admin/contacts/search', methods=['GET'])
 @jwt_required()
-def get_contacts():
+def search_contacts():
+    """Full-text search over contact submissions (name, email, company, message)"""
     try:
+        match = build_match_query(request.args.get('q'))
+        if not match:
+            return jsonify({'error': 'Search query is required'}), 400
+        try:
+            limit = parse_page_size(request.args.get('limit'), 50, 200)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        status = request.args.get('status')
+        
+        condition = '1 = 1'
+        params = []
+        if status:
+            condition = 'p.status = ?'
+            params.append(status)
+        
         conn = get_db_connection()
-        contacts = conn.execute(
-            'SELECT * FROM contacts ORDER BY created_at DESC'
-        ).fetchall()
-        conn.close()
+        if FTS5_AVAILABLE:
+            weights = ', '.join(str(weight) for weight in SEARCH_WEIGHTS['contacts_fts'])
+            rows = conn.execute(f'''
+                SELECT p.*,
+                       snippet(contacts_fts, -1, '<mark>', '</mark>', '…', 16) as snippet,
+                       bm25(contacts_fts, {weights}) as rank
+                FROM contacts_fts
+                JOIN contacts p ON p.id = contacts_fts.rowid
+                WHERE contacts_fts MATCH ? AND {condition}
+                ORDER BY rank
+                LIMIT ?
+            ''', [match] + params + [limit]).fetchall()
+        else:
+            rows = search_with_like(conn, 'contacts', request.args.get('q'), condition, params, limit)
         
-        return jsonify([dict(contact) for contact in contacts])
+        return jsonify([dict(row) for row in rows])
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -645,26 +3108,23 @@ def update_contact_status(contact_id):
         if not new_status or new_status not in ['new', 'replied', 'archived']:
             return jsonify({'error': 'Invalid status'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            'UPDATE contacts SET status = ? WHERE id = ?',
-            (new_status, contact_id)
-        )
-        
-        if cursor.rowcount == 0:
-            conn.close()
-            return jsonify({'error': 'Contact not found'}), 404
-        
-        conn.commit()
+        with db_write() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(
+                'UPDATE contacts SET status = ? WHERE id = ?',
+                (new_status, contact_id)
+            )
+            
+            if cursor.rowcount == 0:
+                return jsonify({'error': 'Contact not found'}), 404
         
         # Fetch and return updated contact
+        conn = get_db_connection()
         contact = conn.execute(
             'SELECT * FROM contacts WHERE id = ?',
             (contact_id,)
         ).fetchone()
-        conn.close()
         
         return jsonify(dict(contact))
         
@@ -676,57 +3136,314 @@ def update_contact_status(contact_id):
 def delete_contact(contact_id):
     """Delete a contact"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('DELETE FROM contacts WHERE id = ?', (contact_id,))
+        with db_write() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('DELETE FROM contacts WHERE id = ?', (contact_id,))
+            
+            if cursor.rowcount == 0:
+                return jsonify({'error': 'Contact not found'}), 404
         
-        if cursor.rowcount == 0:
-            conn.close()
-            return jsonify({'error': 'Contact not found'}), 404
+        return jsonify({'message': 'Contact deleted successfully'})
         
-        conn.commit()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Exports
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+CONTACT_EXPORT_COLUMNS = ('id', 'name', 'email', 'phone', 'company', 'message', 'status', 'created_at')
+PROJECT_EXPORT_COLUMNS = PROJECT_COLUMNS + ('main_image',)
+
+def iter_query_batches(build_query, batch_size):
+    """Yield lists of rows, batch_size at a time, newest first.
+    
+    build_query(limit, cursor) returns a list query in (created_at, id)
+    order; each batch is a separate keyset-paged query, so no read
+    transaction stays open while a slow client downloads. Runs on a
+    connection of its own rather than a pooled one, since it lives as long
+    as the response is being sent; it is closed when the generator finishes
+    or is closed (e.g. the client went away).
+    """
+    conn = connect_db()
+    try:
+        cursor = None
+        while True:
+            rows = conn.execute(*build_query(batch_size, cursor)).fetchall()
+            if rows:
+                yield rows
+            if len(rows) < batch_size:
+                break
+            cursor = (rows[-1]['created_at'], rows[-1]['id'])
+    finally:
         conn.close()
+
+def csv_cell(value):
+    """Keep spreadsheet apps from running submitted text as a formula"""
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        return "'" + value
+    return value
+
+def export_response(batches, columns, fmt, filename):
+    """Stream batches of value lists as CSV (with a header row) or NDJSON.
+    
+    Each batch is encoded and sent as one chunk, so memory use depends on
+    the batch size, not on the number of rows.
+    """
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield buffer.getvalue()
+        for batch in batches:
+            buffer.seek(0)
+            buffer.truncate(0)
+            writer.writerows([csv_cell(value) for value in values] for values in batch)
+            yield buffer.getvalue()
+    
+    def generate_ndjson():
+        for batch in batches:
+            yield ''.join(app.json.dumps(dict(zip(columns, values))) + '\n' for values in batch)
+    
+    generate = generate_csv if fmt == 'csv' else generate_ndjson
+    response = app.response_class(generate(), mimetype=EXPORT_MIMETYPES[fmt])
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}-{stamp}.{fmt}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route('/api/admin/contacts/export', methods=['GET'])
+@jwt_required()
+def export_contacts():
+    """Stream contacts as CSV or NDJSON (format=csv|ndjson), newest first.
+    
+    Takes the same status, since, until and q filters as the contact list.
+    """
+    try:
+        fmt = request.args.get('format', 'csv')
+        if fmt not in EXPORT_MIMETYPES:
+            return jsonify({'error': 'Format must be csv or ndjson'}), 400
+        try:
+            filters = contact_filters(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        return jsonify({'message': 'Contact deleted successfully'})
-        
+        rows = iter_query_batches(
+            lambda limit, cursor: build_contacts_query(filters, limit, cursor), app.config['EXPORT_BATCH_SIZE']
+        )
+        batches = ([[row[column] for column in CONTACT_EXPORT_COLUMNS] for row in batch] for batch in rows)
+        return export_response(batches, CONTACT_EXPORT_COLUMNS, fmt, 'contacts')
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/projects/export', methods=['GET'])
+@jwt_required()
+def export_projects():
+    """Stream active projects as CSV or NDJSON (format=csv|ndjson), newest first.
+    
+    Takes the same featured and category filters as the project list;
+    main_image is the URL of the project's main image.
+    """
+    try:
+        fmt = request.args.get('format', 'csv')
+        if fmt not in EXPORT_MIMETYPES:
+            return jsonify({'error': 'Format must be csv or ndjson'}), 400
+        
+        featured, category = request.args.get('featured'), request.args.get('category')
+        rows = iter_query_batches(
+            lambda limit, cursor: build_projects_query(
+                featured, category, limit=limit, cursor=cursor, fields=PROJECT_EXPORT_COLUMNS
+            ),
+            app.config['EXPORT_BATCH_SIZE']
+        )
+        batches = (
+            [[row[column] for column in PROJECT_COLUMNS]
+             + [UPLOAD_URL_PREFIX + row['main_image'] if row['main_image'] else None]
+             for row in batch]
+            for batch in rows
+        )
+        return export_response(batches, PROJECT_EXPORT_COLUMNS, fmt, 'projects')
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 # File serving
+# Uploads are stored under their content hash (or, for older files, a uuid
+# prefix) and never rewritten, as are the variants and transcodes derived
+# from them
+IMMUTABLE_UPLOAD_RE = re.compile(
+    r'^(?:[0-9a-f]{64}[._]|[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}_)'
+)
+# Path a blob is first stored under, named after the hash of the uploaded bytes
+BLOB_ORIGINAL_RE = re.compile(rf'^{BLOB_FOLDER}/[0-9a-f]{{2}}/([0-9a-f]{{64}})\.\w+$')
+
+def send_upload(path, mimetype=None):
+    """Send a file from the upload folder, or hand it to the front proxy"""
+    if app.config['UPLOAD_SENDFILE_MODE'] == 'x-accel':
+        if safe_join(app.config['UPLOAD_FOLDER'], path) is None:
+            raise NotFound()
+        # nginx answers Range and conditional requests for the internal location
+        response = make_response('')
+        response.headers['X-Accel-Redirect'] = app.config['UPLOAD_ACCEL_PREFIX'].rstrip('/') + '/' + path
+        response.headers['Content-Type'] = mimetype or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    else:
+        # Handles If-None-Match/If-Modified-Since and Range requests; uses
+        # X-Sendfile when USE_X_SENDFILE is on
+        response = send_from_directory(app.config['UPLOAD_FOLDER'], path, mimetype=mimetype)
+        response.accept_ranges = 'bytes'
+    
+    if IMMUTABLE_UPLOAD_RE.match(os.path.basename(path)):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = app.config['UPLOAD_MAX_AGE']
+        response.cache_control.immutable = True
+    return response
+
 @app.route('/uploads/<path:filename>')
 def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    """Serve uploaded files, negotiating WebP/AVIF for JPEG and PNG images"""
+    # Processing can move an oversized upload to a new file; the URL the
+    # upload returned keeps working through a (not cached) redirect
+    match = BLOB_ORIGINAL_RE.match(filename)
+    if match and not os.path.isfile(os.path.join(app.config['UPLOAD_FOLDER'], filename)):
+        blob = get_db_connection().execute('SELECT path FROM blobs WHERE hash = ?', (match.group(1),)).fetchone()
+        if blob is not None and blob['path'] != filename:
+            return redirect(url_for('uploaded_file', filename=blob['path']))
+    
+    if os.path.splitext(filename)[1].lower() not in TRANSCODED_EXTENSIONS:
+        return send_upload(filename)
+    
+    path, mimetype = choose_image_encoding(filename, request.accept_mimetypes)
+    response = send_upload(path, mimetype)
+    response.vary.add('Accept')
+    return response
+
+# Placeholder images
+class PlaceholderCache:
+    """Rendered placeholder JPEGs keyed by size.
+
+    Bodies are kept in a small in-memory LRU. Sizes in stored_sizes are
+    also written once to uploads/placeholders, so they are rendered at most
+    once per deployment; no other size is persisted, so walking through
+    sizes cannot fill the disk. Concurrent requests for a size that is not
+    cached yet wait on a per-size lock instead of rendering it again.
+    """
+
+    def __init__(self, directory, max_entries=32, stored_sizes=()):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.stored_sizes = frozenset(stored_sizes)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._rendering = {}
+
+    def get(self, width, height):
+        """Return (body, etag) for a placeholder of the given size"""
+        key = (width, height)
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry
+            key_lock = self._rendering.setdefault(key, threading.Lock())
+        
+        with key_lock:
+            with self._lock:
+                entry = self._lookup(key)
+            if entry is None:
+                body = self._load(width, height)
+                entry = (body, hashlib.blake2b(body, digest_size=16).hexdigest())
+                with self._lock:
+                    self._entries[key] = entry
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        
+        with self._lock:
+            self._rendering.pop(key, None)
+        return entry
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _load(self, width, height):
+        if (width, height) not in self.stored_sizes:
+            return render_placeholder(width, height)
+        
+        path = os.path.join(self.directory, f"{width}x{height}.jpg")
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+        
+        body = render_placeholder(width, height)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write under a temporary name so other processes never read a partial file
+            temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(body)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not store placeholder {width}x{height}: {e}")
+        return body
+
+def render_placeholder(width, height):
+    img = Image.new('RGB', (width, height), color='#64748b')
+    draw = ImageDraw.Draw(img)
+    
+    text = f"Steel Project\n{width}x{height}"
+    text_bbox = draw.textbbox((0, 0), text)
+    text_width = text_bbox[2] - text_bbox[0]
+    text_height = text_bbox[3] - text_bbox[1]
+    
+    position = ((width - text_width) // 2, (height - text_height) // 2)
+    draw.text(position, text, fill='white')
+    
+    buffer = io.BytesIO()
+    img.save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+placeholder_cache = PlaceholderCache(
+    os.path.join(UPLOAD_FOLDER, 'placeholders'),
+    max_entries=app.config['PLACEHOLDER_CACHE_ENTRIES'],
+    stored_sizes=app.config['PLACEHOLDER_STORED_SIZES']
+)
 
 @app.route('/api/placeholder/<int:width>/<int:height>')
 def placeholder_image(width, height):
     """Generate placeholder images for demo purposes"""
     try:
-        # Create a simple placeholder image
-        from PIL import Image, ImageDraw, ImageFont
-        
-        img = Image.new('RGB', (width, height), color='#64748b')
-        draw = ImageDraw.Draw(img)
-        
-        text = f"Steel Project\n{width}x{height}"
-        text_bbox = draw.textbbox((0, 0), text)
-        text_width = text_bbox[2] - text_bbox[0]
-        text_height = text_bbox[3] - text_bbox[1]
-        
-        position = ((width - text_width) // 2, (height - text_height) // 2)
-        draw.text(position, text, fill='white')
-        
-        # Save to a temporary location
-        placeholder_path = f"{UPLOAD_FOLDER}/placeholder_{width}x{height}.jpg"
-        img.save(placeholder_path, 'JPEG')
-        
-        return send_from_directory(os.path.dirname(placeholder_path), 
-                                 os.path.basename(placeholder_path))
+        max_width = app.config['PLACEHOLDER_MAX_WIDTH']
+        max_height = app.config['PLACEHOLDER_MAX_HEIGHT']
+        if not (1 <= width <= max_width and 1 <= height <= max_height):
+            return jsonify({'error': f'Placeholder size must be between 1x1 and {max_width}x{max_height}'}), 400
+        
+        body, etag = placeholder_cache.get(width, height)
+        
+        response = make_response(body)
+        response.mimetype = 'image/jpeg'
+        response.set_etag(etag)
+        # The image for a given size never changes
+        response.cache_control.public = True
+        response.cache_control.max_age = 31536000
+        response.cache_control.immutable = True
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 # Public Home Content Route (no authentication required)
+HOME_CONTENT_SQL = 'SELECT content_key, content_value FROM home_content'
+HERO_IMAGES_SQL = 'SELECT id, filename, alt_text FROM hero_images ORDER BY display_order, created_at'
+SETTINGS_BY_PREFIX_SQL = 'SELECT content_key, content_value FROM home_content WHERE content_key LIKE ?'
+
 @app.route('/api/home-content', methods=['GET'])
+@cached_response('home_content')
 def get_public_home_content():
     """Get home content for public website"""
     try:
@@ -734,20 +3451,18 @@ def get_public_home_content():
         
         # Get all home content from database
         content = {}
-        rows = conn.execute('SELECT content_key, content_value FROM home_content').fetchall()
+        rows = conn.execute(HOME_CONTENT_SQL).fetchall()
         for row in rows:
             content[row['content_key']] = row['content_value']
         
         # Get hero images from database
         hero_images = []
-        image_rows = conn.execute(
-            'SELECT id, filename, alt_text FROM hero_images ORDER BY display_order, created_at'
-        ).fetchall()
+        image_rows = conn.execute(HERO_IMAGES_SQL).fetchall()
         
         for row in image_rows:
             hero_images.append({
                 'id': row['id'],
-                'url': f'http://localhost:5001/uploads/gallery/{row["filename"]}',
+                'url': f'http://localhost:5001/uploads/{hero_image_path(row["filename"])}',
                 'alt': row['alt_text'] or f'Hero Image {row["id"]}'
             })
         
@@ -759,8 +3474,6 @@ def get_public_home_content():
                 {'id': 3, 'url': '/api/placeholder/800/600', 'alt': 'Steel Construction Project 3'}
             ]
         
-        conn.close()
-        
         # Format data for frontend
         home_data = {
             'heroImages': hero_images,
@@ -778,6 +3491,7 @@ def get_public_home_content():
 
 # Company Info Endpoint (Public)
 @app.route('/api/company-info', methods=['GET'])
+@cached_response('company_info')
 def get_public_company_info():
     """Get company information for public website (footer, contact info)"""
     try:
@@ -785,10 +3499,7 @@ def get_public_company_info():
         
         # Get all company settings from database
         company_data = {}
-        rows = conn.execute(
-            'SELECT content_key, content_value FROM home_content WHERE content_key LIKE ?', 
-            ('company_%',)
-        ).fetchall()
+        rows = conn.execute(SETTINGS_BY_PREFIX_SQL, ('company_%',)).fetchall()
         
         for row in rows:
             key = row['content_key'].replace('company_', '')
@@ -800,10 +3511,7 @@ def get_public_company_info():
                 company_data[key] = row['content_value']
         
         # Also get footer-specific settings
-        footer_rows = conn.execute(
-            'SELECT content_key, content_value FROM home_content WHERE content_key LIKE ?', 
-            ('footer_%',)
-        ).fetchall()
+        footer_rows = conn.execute(SETTINGS_BY_PREFIX_SQL, ('footer_%',)).fetchall()
         
         for row in footer_rows:
             key = row['content_key']  # Keep the full key with footer_ prefix
@@ -846,7 +3554,6 @@ def get_public_company_info():
             if key not in company_data:
                 company_data[key] = default_value
         
-        conn.close()
         return jsonify(company_data)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -860,20 +3567,18 @@ def get_home_content():
         
         # Get all home content from database
         content = {}
-        rows = conn.execute('SELECT content_key, content_value FROM home_content').fetchall()
+        rows = conn.execute(HOME_CONTENT_SQL).fetchall()
         for row in rows:
             content[row['content_key']] = row['content_value']
         
         # Get hero images from database
         hero_images = []
-        image_rows = conn.execute(
-            'SELECT id, filename, alt_text FROM hero_images ORDER BY display_order, created_at'
-        ).fetchall()
+        image_rows = conn.execute(HERO_IMAGES_SQL).fetchall()
         
         for row in image_rows:
             hero_images.append({
                 'id': row['id'],
-                'url': f'http://localhost:5001/uploads/gallery/{row["filename"]}',
+                'url': f'http://localhost:5001/uploads/{hero_image_path(row["filename"])}',
                 'alt': row['alt_text'] or f'Hero Image {row["id"]}'
             })
         
@@ -885,8 +3590,6 @@ def get_home_content():
                 {'id': 3, 'url': '/api/placeholder/800/600', 'alt': 'Steel Construction Project 3'}
             ]
         
-        conn.close()
-        
         # Format data for frontend
         home_data = {
             'heroImages': hero_images,
@@ -909,19 +3612,19 @@ def update_company_description():
         data = request.get_json()
         description = data.get('description', '')
         
-        conn = get_db_connection()
-        conn.execute(
-            "UPDATE home_content SET content_value = ?, updated_at = CURRENT_TIMESTAMP WHERE content_key = ?",
-            (description, 'company_description')
-        )
-        # If no row was updated, insert it
-        if conn.total_changes == 0:
-            conn.execute(
-                "INSERT INTO home_content (content_key, content_value) VALUES (?, ?)",
-                ('company_description', description)
+        with db_write() as conn:
+            cursor = conn.execute(
+                "UPDATE home_content SET content_value = ?, updated_at = CURRENT_TIMESTAMP WHERE content_key = ?",
+                (description, 'company_description')
             )
-        conn.commit()
-        conn.close()
+            # If no row was updated, insert it
+            if cursor.rowcount == 0:
+                conn.execute(
+                    "INSERT INTO home_content (content_key, content_value) VALUES (?, ?)",
+                    ('company_description', description)
+                )
+            
+            invalidate_cache(conn, 'home_content')
         
         return jsonify({'message': 'Company description updated successfully'})
     except Exception as e:
@@ -939,31 +3642,29 @@ def update_stats():
         team = data.get('teamMembers', '')
         satisfaction = data.get('clientSatisfaction', '')
         
-        conn = get_db_connection()
-        
-        # Update each stat
-        stats_mapping = {
-            'years_experience': str(years_exp),
-            'projects_completed': str(projects), 
-            'team_members': str(team),
-            'client_satisfaction': str(satisfaction)
-        }
-        
-        for key, value in stats_mapping.items():
-            if value:  # Only update if value provided
-                conn.execute(
-                    "UPDATE home_content SET content_value = ?, updated_at = CURRENT_TIMESTAMP WHERE content_key = ?",
-                    (value, key)
-                )
-                # If no row was updated, insert it
-                if conn.total_changes == 0:
-                    conn.execute(
-                        "INSERT INTO home_content (content_key, content_value) VALUES (?, ?)",
-                        (key, value)
+        with db_write() as conn:
+            # Update each stat
+            stats_mapping = {
+                'years_experience': str(years_exp),
+                'projects_completed': str(projects), 
+                'team_members': str(team),
+                'client_satisfaction': str(satisfaction)
+            }
+            
+            for key, value in stats_mapping.items():
+                if value:  # Only update if value provided
+                    cursor = conn.execute(
+                        "UPDATE home_content SET content_value = ?, updated_at = CURRENT_TIMESTAMP WHERE content_key = ?",
+                        (value, key)
                     )
-        
-        conn.commit()
-        conn.close()
+                    # If no row was updated, insert it
+                    if cursor.rowcount == 0:
+                        conn.execute(
+                            "INSERT INTO home_content (content_key, content_value) VALUES (?, ?)",
+                            (key, value)
+                        )
+            
+            invalidate_cache(conn, 'home_content')
         
         return jsonify({'message': 'Statistics updated successfully'})
     except Exception as e:
@@ -975,58 +3676,47 @@ def upload_hero_images():
     try:
         uploaded_images = []
         
-        # Check for both 'image' (single) and 'images' (multiple) fields
-        files = []
-        if 'images' in request.files:
-            files = request.files.getlist('images')
-        elif 'image' in request.files:
-            files = [request.files['image']]
-        
-        if not files:
-            return jsonify({'error': 'No image files provided'}), 400
-        
-        for file in files:
-            if file and file.filename != '' and allowed_file(file.filename):
-                # Generate unique filename
-                filename = secure_filename(file.filename)
-                unique_filename = f"{uuid.uuid4().hex}_{filename}"
-                
-                # Ensure gallery directory exists
-                gallery_path = os.path.join(UPLOAD_FOLDER, 'gallery')
-                os.makedirs(gallery_path, exist_ok=True)
-                
-                # Save file
-                file_path = os.path.join(gallery_path, unique_filename)
-                file.save(file_path)
+        # Accept both 'image' (single) and 'images' (multiple) fields
+        _, saved_files = receive_image_uploads({'images', 'image'})
+        if not saved_files:
+            return jsonify({'error': 'No valid image files were uploaded'}), 400
+        
+        # Save to database and queue optimization
+        with db_write() as conn:
+            cursor = conn.cursor()
+            for digest, temp_path, ext, original_name in saved_files:
+                blob, is_new = acquire_blob(conn, digest, temp_path, ext)
+                job_id = image_jobs.enqueue(conn, 'blob', blob['path']) if is_new else None
                 
-                # Save to database
-                conn = get_db_connection()
-                cursor = conn.cursor()
                 cursor.execute(
-                    "INSERT INTO hero_images (filename, original_name, alt_text, display_order) VALUES (?, ?, ?, ?)",
-                    (unique_filename, file.filename, f'Hero Image {len(uploaded_images) + 1}', len(uploaded_images))
+                    "INSERT INTO hero_images (filename, original_name, alt_text, display_order, processing_status) VALUES (?, ?, ?, ?, ?)",
+                    (blob['path'], original_name, f'Hero Image {len(uploaded_images) + 1}', len(uploaded_images),
+                     blob['processing_status'])
                 )
                 image_id = cursor.lastrowid
-                conn.commit()
-                conn.close()
                 
                 # Add to uploaded images list
                 image_data = {
                     'id': image_id,
-                    'url': f'http://localhost:5001/uploads/gallery/{unique_filename}',
+                    'job_id': job_id,
+                    'url': f"http://localhost:5001/uploads/{blob['path']}",
                     'alt': f'Hero Image {len(uploaded_images) + 1}',
-                    'filename': unique_filename
+                    'filename': blob['path'],
+                    'status': blob['processing_status']
                 }
                 uploaded_images.append(image_data)
+            
+            invalidate_cache(conn, 'home_content')
         
-        if not uploaded_images:
-            return jsonify({'error': 'No valid image files were uploaded'}), 400
+        image_jobs.notify()
         
         return jsonify({
             'message': f'{len(uploaded_images)} image(s) uploaded successfully',
             'images': uploaded_images
-        })
+        }), 202
         
+    except UploadRejected as e:
+        return jsonify({'error': str(e)}), e.status
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1035,29 +3725,22 @@ def upload_hero_images():
 @jwt_required()
 def delete_hero_image(image_id):
     try:
-        conn = get_db_connection()
-        
-        # Get the filename before deleting
-        image = conn.execute(
-            'SELECT filename FROM hero_images WHERE id = ?', (image_id,)
-        ).fetchone()
-        
-        if not image:
-            conn.close()
-            return jsonify({'error': 'Image not found'}), 404
-        
-        # Delete from database
-        conn.execute('DELETE FROM hero_images WHERE id = ?', (image_id,))
-        conn.commit()
-        conn.close()
-        
-        # Delete physical file
-        try:
-            file_path = os.path.join(UPLOAD_FOLDER, 'gallery', image['filename'])
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        except Exception as e:
-            print(f"Warning: Could not delete file {image['filename']}: {e}")
+        with db_write() as conn:
+            # Get the filename before deleting
+            image = conn.execute(
+                'SELECT filename FROM hero_images WHERE id = ?', (image_id,)
+            ).fetchone()
+            
+            if not image:
+                return jsonify({'error': 'Image not found'}), 404
+            
+            # Delete from database
+            conn.execute('DELETE FROM hero_images WHERE id = ?', (image_id,))
+            
+            # Delete physical file unless a project image shares it
+            release_image(conn, hero_image_path(image['filename']))
+            
+            invalidate_cache(conn, 'home_content')
         
         return jsonify({'message': 'Image deleted successfully'})
         
@@ -1065,18 +3748,21 @@ def delete_hero_image(image_id):
         return jsonify({'error': str(e)}), 500
 
 # Employee Management APIs
+PUBLIC_EMPLOYEES_SQL = '''
+    SELECT id, name, role, experience_years, specialty, avatar_url 
+    FROM employees 
+    WHERE is_active = 1 
+    ORDER BY display_order, name
+'''
+
 @app.route('/api/employees', methods=['GET'])
+@cached_response('employees')
 def get_employees():
     """Get all active employees for public website"""
     try:
         conn = get_db_connection()
         employees = []
-        rows = conn.execute('''
-            SELECT id, name, role, experience_years, specialty, avatar_url 
-            FROM employees 
-            WHERE is_active = 1 
-            ORDER BY display_order, name
-        ''').fetchall()
+        rows = conn.execute(PUBLIC_EMPLOYEES_SQL).fetchall()
         
         for row in rows:
             employees.append({
@@ -1089,7 +3775,6 @@ def get_employees():
                 'verified': True
             })
         
-        conn.close()
         return jsonify(employees)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1121,7 +3806,6 @@ def get_admin_employees():
                 'created_at': row['created_at']
             })
         
-        conn.close()
         return jsonify(employees)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1133,26 +3817,26 @@ def create_employee():
     try:
         data = request.get_json()
         
-        conn = get_db_connection()
-        conn.execute('''
-            INSERT INTO employees (name, role, experience_years, specialty, bio, email, phone, avatar_url, display_order, is_active)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data.get('name'),
-            data.get('role'),
-            data.get('experience_years'),
-            data.get('specialty'),
-            data.get('bio'),
-            data.get('email'),
-            data.get('phone'),
-            data.get('avatar_url'),
-            data.get('display_order', 0),
-            data.get('is_active', True)
-        ))
-        conn.commit()
-        
-        employee_id = conn.lastrowid
-        conn.close()
+        with db_write() as conn:
+            cursor = conn.execute('''
+                INSERT INTO employees (name, role, experience_years, specialty, bio, email, phone, avatar_url, display_order, is_active)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                data.get('name'),
+                data.get('role'),
+                data.get('experience_years'),
+                data.get('specialty'),
+                data.get('bio'),
+                data.get('email'),
+                data.get('phone'),
+                data.get('avatar_url'),
+                data.get('display_order', 0),
+                data.get('is_active', True)
+            ))
+            
+            invalidate_cache(conn, 'employees')
+        
+        employee_id = cursor.lastrowid
         
         return jsonify({'message': 'Employee created successfully', 'id': employee_id}), 201
     except Exception as e:
@@ -1165,26 +3849,26 @@ def update_employee(employee_id):
     try:
         data = request.get_json()
         
-        conn = get_db_connection()
-        conn.execute('''
-            UPDATE employees 
-            SET name=?, role=?, experience_years=?, specialty=?, bio=?, email=?, phone=?, avatar_url=?, display_order=?, is_active=?
-            WHERE id=?
-        ''', (
-            data.get('name'),
-            data.get('role'),
-            data.get('experience_years'),
-            data.get('specialty'),
-            data.get('bio'),
-            data.get('email'),
-            data.get('phone'),
-            data.get('avatar_url'),
-            data.get('display_order', 0),
-            data.get('is_active', True),
-            employee_id
-        ))
-        conn.commit()
-        conn.close()
+        with db_write() as conn:
+            conn.execute('''
+                UPDATE employees 
+                SET name=?, role=?, experience_years=?, specialty=?, bio=?, email=?, phone=?, avatar_url=?, display_order=?, is_active=?
+                WHERE id=?
+            ''', (
+                data.get('name'),
+                data.get('role'),
+                data.get('experience_years'),
+                data.get('specialty'),
+                data.get('bio'),
+                data.get('email'),
+                data.get('phone'),
+                data.get('avatar_url'),
+                data.get('display_order', 0),
+                data.get('is_active', True),
+                employee_id
+            ))
+            
+            invalidate_cache(conn, 'employees')
         
         return jsonify({'message': 'Employee updated successfully'})
     except Exception as e:
@@ -1195,28 +3879,31 @@ def update_employee(employee_id):
 def delete_employee(employee_id):
     """Delete employee"""
     try:
-        conn = get_db_connection()
-        conn.execute('DELETE FROM employees WHERE id=?', (employee_id,))
-        conn.commit()
-        conn.close()
+        with db_write() as conn:
+            conn.execute('DELETE FROM employees WHERE id=?', (employee_id,))
+            
+            invalidate_cache(conn, 'employees')
         
         return jsonify({'message': 'Employee deleted successfully'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 # Contact Cards Management APIs
+PUBLIC_CONTACT_CARDS_SQL = '''
+    SELECT id, title, details, sub_details, contact_type, icon_emoji 
+    FROM contact_cards 
+    WHERE is_active = 1 
+    ORDER BY display_order, title
+'''
+
 @app.route('/api/contact-cards', methods=['GET'])
+@cached_response('contact_cards')
 def get_contact_cards():
     """Get all active contact cards for public website"""
     try:
         conn = get_db_connection()
         cards = []
-        rows = conn.execute('''
-            SELECT id, title, details, sub_details, contact_type, icon_emoji 
-            FROM contact_cards 
-            WHERE is_active = 1 
-            ORDER BY display_order, title
-        ''').fetchall()
+        rows = conn.execute(PUBLIC_CONTACT_CARDS_SQL).fetchall()
         
         for row in rows:
             cards.append({
@@ -1229,7 +3916,6 @@ def get_contact_cards():
                 'verified': True
             })
         
-        conn.close()
         return jsonify(cards)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1258,7 +3944,6 @@ def get_admin_contact_cards():
                 'created_at': row['created_at']
             })
         
-        conn.close()
         return jsonify(cards)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1270,23 +3955,23 @@ def create_contact_card():
     try:
         data = request.get_json()
         
-        conn = get_db_connection()
-        conn.execute('''
-            INSERT INTO contact_cards (title, details, sub_details, contact_type, icon_emoji, display_order, is_active)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data.get('title'),
-            data.get('details'),
-            data.get('sub_details'),
-            data.get('contact_type'),
-            data.get('icon_emoji'),
-            data.get('display_order', 0),
-            data.get('is_active', True)
-        ))
-        conn.commit()
-        
-        card_id = conn.lastrowid
-        conn.close()
+        with db_write() as conn:
+            cursor = conn.execute('''
+                INSERT INTO contact_cards (title, details, sub_details, contact_type, icon_emoji, display_order, is_active)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                data.get('title'),
+                data.get('details'),
+                data.get('sub_details'),
+                data.get('contact_type'),
+                data.get('icon_emoji'),
+                data.get('display_order', 0),
+                data.get('is_active', True)
+            ))
+            
+            invalidate_cache(conn, 'contact_cards')
+        
+        card_id = cursor.lastrowid
         
         return jsonify({'message': 'Contact card created successfully', 'id': card_id}), 201
     except Exception as e:
@@ -1299,23 +3984,23 @@ def update_contact_card(card_id):
     try:
         data = request.get_json()
         
-        conn = get_db_connection()
-        conn.execute('''
-            UPDATE contact_cards 
-            SET title=?, details=?, sub_details=?, contact_type=?, icon_emoji=?, display_order=?, is_active=?
-            WHERE id=?
-        ''', (
-            data.get('title'),
-            data.get('details'),
-            data.get('sub_details'),
-            data.get('contact_type'),
-            data.get('icon_emoji'),
-            data.get('display_order', 0),
-            data.get('is_active', True),
-            card_id
-        ))
-        conn.commit()
-        conn.close()
+        with db_write() as conn:
+            conn.execute('''
+                UPDATE contact_cards 
+                SET title=?, details=?, sub_details=?, contact_type=?, icon_emoji=?, display_order=?, is_active=?
+                WHERE id=?
+            ''', (
+                data.get('title'),
+                data.get('details'),
+                data.get('sub_details'),
+                data.get('contact_type'),
+                data.get('icon_emoji'),
+                data.get('display_order', 0),
+                data.get('is_active', True),
+                card_id
+            ))
+            
+            invalidate_cache(conn, 'contact_cards')
         
         return jsonify({'message': 'Contact card updated successfully'})
     except Exception as e:
@@ -1326,10 +4011,10 @@ def update_contact_card(card_id):
 def delete_contact_card(card_id):
     """Delete contact card"""
     try:
-        conn = get_db_connection()
-        conn.execute('DELETE FROM contact_cards WHERE id=?', (card_id,))
-        conn.commit()
-        conn.close()
+        with db_write() as conn:
+            conn.execute('DELETE FROM contact_cards WHERE id=?', (card_id,))
+            
+            invalidate_cache(conn, 'contact_cards')
         
         return jsonify({'message': 'Contact card deleted successfully'})
     except Exception as e:
@@ -1342,16 +4027,12 @@ def delete_contact_card(card_id):
 def get_company_settings():
     """Get all company settings"""
     try:
-        conn = sqlite3.connect(DATABASE)
-        conn.row_factory = sqlite3.Row
+        conn = get_db_connection()
         
         settings = {}
         
         # Get all settings from home_content table with 'company_' prefix
-        rows = conn.execute(
-            'SELECT content_key, content_value FROM home_content WHERE content_key LIKE ?', 
-            ('company_%',)
-        ).fetchall()
+        rows = conn.execute(SETTINGS_BY_PREFIX_SQL, ('company_%',)).fetchall()
         
         for row in rows:
             # Remove 'company_' prefix from key
@@ -1364,10 +4045,7 @@ def get_company_settings():
                 settings[key] = row['content_value']
         
         # Also get footer settings with 'footer_' prefix
-        footer_rows = conn.execute(
-            'SELECT content_key, content_value FROM home_content WHERE content_key LIKE ?', 
-            ('footer_%',)
-        ).fetchall()
+        footer_rows = conn.execute(SETTINGS_BY_PREFIX_SQL, ('footer_%',)).fetchall()
         
         for row in footer_rows:
             key = row['content_key']  # Keep the full key with footer_ prefix
@@ -1436,7 +4114,6 @@ def get_company_settings():
             if key not in settings:
                 settings[key] = default_value
         
-        conn.close()
         return jsonify(settings)
     
     except Exception as e:
@@ -1451,41 +4128,40 @@ def update_company_settings():
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        conn = sqlite3.connect(DATABASE)
-        cursor = conn.cursor()
-        
-        # Update each setting
-        for key, value in data.items():
-            # Only add 'company_' prefix if key doesn't already have a prefix
-            if key.startswith('footer_') or key.startswith('dashboard_'):
-                content_key = key  # Keep footer_* and dashboard_* keys as-is
-            else:
-                content_key = f'company_{key}'  # Add prefix for other keys
+        with db_write() as conn:
+            cursor = conn.cursor()
             
-            # Convert complex data to JSON string
-            if isinstance(value, (dict, list)):
-                content_value = json.dumps(value)
-            elif isinstance(value, bool):
-                # Convert boolean to "true"/"false" string for consistency
-                content_value = "true" if value else "false"
-            else:
-                content_value = str(value)
+            # Update each setting
+            for key, value in data.items():
+                # Only add 'company_' prefix if key doesn't already have a prefix
+                if key.startswith('footer_') or key.startswith('dashboard_'):
+                    content_key = key  # Keep footer_* and dashboard_* keys as-is
+                else:
+                    content_key = f'company_{key}'  # Add prefix for other keys
             
-            # Try to update existing record
-            cursor.execute(
-                "UPDATE home_content SET content_value = ?, updated_at = CURRENT_TIMESTAMP WHERE content_key = ?",
-                (content_value, content_key)
-            )
+                # Convert complex data to JSON string
+                if isinstance(value, (dict, list)):
+                    content_value = json.dumps(value)
+                elif isinstance(value, bool):
+                    # Convert boolean to "true"/"false" string for consistency
+                    content_value = "true" if value else "false"
+                else:
+                    content_value = str(value)
             
-            # If no rows were affected, insert new record
-            if cursor.rowcount == 0:
+                # Try to update existing record
                 cursor.execute(
-                    "INSERT INTO home_content (content_key, content_value) VALUES (?, ?)",
-                    (content_key, content_value)
+                    "UPDATE home_content SET content_value = ?, updated_at = CURRENT_TIMESTAMP WHERE content_key = ?",
+                    (content_value, content_key)
                 )
-        
-        conn.commit()
-        conn.close()
+            
+                # If no rows were affected, insert new record
+                if cursor.rowcount == 0:
+                    cursor.execute(
+                        "INSERT INTO home_content (content_key, content_value) VALUES (?, ?)",
+                        (content_key, content_value)
+                    )
+            
+            invalidate_cache(conn, 'company_info', 'home_content')
         
         return jsonify({'message': 'Company settings updated successfully'})
     
@@ -1498,14 +4174,10 @@ def update_company_settings():
 def get_dashboard_settings():
     """Get dashboard settings"""
     try:
-        conn = sqlite3.connect(DATABASE)
-        conn.row_factory = sqlite3.Row
+        conn = get_db_connection()
         
         # Get dashboard settings from home_content table with 'dashboard_' prefix
-        rows = conn.execute(
-            'SELECT content_key, content_value FROM home_content WHERE content_key LIKE ?', 
-            ('dashboard_%',)
-        ).fetchall()
+        rows = conn.execute(SETTINGS_BY_PREFIX_SQL, ('dashboard_%',)).fetchall()
         
         settings = {}
         for row in rows:
@@ -1576,7 +4248,6 @@ def get_dashboard_settings():
                 }
             ]
         
-        conn.close()
         return jsonify(settings)
     
     except Exception as e:
@@ -1591,40 +4262,69 @@ def update_dashboard_settings():
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        conn = sqlite3.connect(DATABASE)
-        cursor = conn.cursor()
-        
-        # Update each setting with 'dashboard_' prefix
-        for key, value in data.items():
-            content_key = f'dashboard_{key}'
-            content_value = json.dumps(value)
+        with db_write() as conn:
+            cursor = conn.cursor()
             
-            cursor.execute(
-                "UPDATE home_content SET content_value = ?, updated_at = CURRENT_TIMESTAMP WHERE content_key = ?",
-                (content_value, content_key)
-            )
+            # Update each setting with 'dashboard_' prefix
+            for key, value in data.items():
+                content_key = f'dashboard_{key}'
+                content_value = json.dumps(value)
             
-            if cursor.rowcount == 0:
                 cursor.execute(
-                    "INSERT INTO home_content (content_key, content_value) VALUES (?, ?)",
-                    (content_key, content_value)
+                    "UPDATE home_content SET content_value = ?, updated_at = CURRENT_TIMESTAMP WHERE content_key = ?",
+                    (content_value, content_key)
                 )
-        
-        conn.commit()
-        conn.close()
+            
+                if cursor.rowcount == 0:
+                    cursor.execute(
+                        "INSERT INTO home_content (content_key, content_value) VALUES (?, ?)",
+                        (content_key, content_value)
+                    )
         
         return jsonify({'message': 'Dashboard settings updated successfully'})
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/uploads/<path:filename>')
-def serve_upload(filename):
-    """Serve uploaded files"""
-    return send_from_directory(UPLOAD_FOLDER, filename)
+# Application factory
+def create_app():
+    """Prepare the app for serving and return it.
 
-# Initialize database on startup
-if __name__ == '__main__':
+    Creates or migrates the schema and writes out contact submissions
+    spooled by processes that are gone. Nothing here leaves connections open
+    or starts threads, so a pre-forking server can call it once in the
+    master (gunicorn --preload) and fork workers afterwards. Each worker
+    process starts its own image job and contact flusher threads on its
+    first request.
+    """
     init_db()
+    contact_buffer.replay()
+    db_writer.close()
+    return app
+
+@app.before_request
+def start_background_workers():
+    # A no-op check after the first request in each process
+    image_jobs.start()
+    contact_buffer.start()
+
+def reset_after_fork():
+    """Drop database connections and thread state copied from the parent.
+
+    Call from a pre-forking server's post-fork hook. SQLite connections must
+    not be used across fork(), so the child opens its own.
+    """
+    db_pool.reset()
+    db_writer.reset()
+    image_jobs.reset()
+    password_verifier.reset()
+    rate_limit_store.reset()
+    contact_buffer.reset()
+
+# Development server
+if __name__ == '__main__':
+    create_app()
+    image_jobs.start()
+    contact_buffer.start()
     port = int(os.environ.get('PORT', 5001))
     app.run(debug=True, host='0.0.0.0', port=port)
@@ -0,0 +1,53 @@
+"""Gunicorn settings for serving the backend in production.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting can be overridden with the environment variable named next
+to it. The app is preloaded in the master, so the schema check runs once
+and workers fork with the code already imported; each worker then drops
+the inherited SQLite state and opens its own connections.
+"""
+
+import os
+import multiprocessing
+
+# Listen address (BIND)
+bind = os.environ.get('BIND', '0.0.0.0:' + os.environ.get('PORT', '5001'))
+
+# Processes use every core; threads per process overlap SQLite and file I/O
+# waits (WEB_CONCURRENCY, GUNICORN_THREADS)
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+
+# In-memory rate limit buckets would give each worker its own allowance, so
+# share them through SQLite unless told otherwise (RATE_LIMIT_BACKEND)
+os.environ.setdefault('RATE_LIMIT_BACKEND', 'sqlite')
+if workers > 1 and os.environ['RATE_LIMIT_BACKEND'] == 'memory':
+    print(f"Warning: RATE_LIMIT_BACKEND=memory with {workers} workers multiplies every rate limit by {workers}")
+
+# Import the app (and migrate the schema) once, before forking
+preload_app = True
+
+# A worker that stops responding is killed after `timeout` seconds; on
+# restart or HUP, workers get `graceful_timeout` seconds to finish requests
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers now and then to bound memory growth; jitter keeps them
+# from restarting all at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.environ.get('GUNICORN_ERROR_LOG', '-')
+
+def post_fork(server, worker):
+    from app import reset_after_fork
+    reset_after_fork()
+
+def worker_exit(server, worker):
+    # Write out spooled contact submissions before the worker goes away
+    from app import contact_buffer
+    contact_buffer.stop(timeout=graceful_timeout)
@@ -0,0 +1,11 @@
+"""WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Run from the backend directory; database and upload paths are relative to
+it unless DATABASE_PATH / UPLOAD_PATH are set.
+"""
+
+from app import create_app
+
+app = create_app()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Load-test and benchmark harness for the backend API
+
+Seeds a throwaway database with synthetic projects, images and contacts,
+drives public and admin endpoints (plus the contact form and admin login
+writes) with concurrent clients, and reports
+latency percentiles and throughput per endpoint. Results are written as
+JSON so runs on different commits can be compared with --compare.
+
+The site database and uploads folder are never touched: DATABASE_PATH,
+UPLOAD_PATH, RATE_LIMIT_DB and CONTACT_SPOOL_DIR point the backend at a
+temporary directory before it is imported.
+
+Examples:
+    python benchmark_api.py
+    python benchmark_api.py --projects 5000 --concurrency 16 --requests 500
+    python benchmark_api.py --mode wsgi --no-cache --output before.json
+    python benchmark_api.py --compare before.json --output after.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import http.client
+from datetime import datetime, timedelta, timezone
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(ROOT_DIR, 'backend')
+
+WORDS = ('steel', 'warehouse', 'hangar', 'factory', 'truss', 'bridge', 'canopy', 'mezzanine',
+         'cladding', 'frame', 'industrial', 'commercial', 'residential', 'tower', 'roof')
+CATEGORIES = ('industrial', 'commercial', 'residential', 'infrastructure')
+CITIES = ('Cairo', 'Alexandria', 'Giza', 'Suez', 'Port Said', 'Luxor')
+
+CONTACT_BODY = {'name': 'Client {n}', 'email': 'client{n}@example.com', 'company': '{word} Co',
+                'message': 'Quote request for a {word} structure'}
+LOGIN_BODY = {'username': 'admin', 'password': 'admin123'}
+
+# name -> (method, path, needs admin token, JSON body or None); {project_id},
+# {word} and {n} are filled per request, in the path and in body values
+SCENARIOS = {
+    'projects_list': ('GET', '/api/projects', False, None),
+    'projects_page': ('GET', '/api/projects?limit=20', False, None),
+    'projects_featured': ('GET', '/api/projects?featured=true&limit=6', False, None),
+    'projects_fields': ('GET', '/api/projects?limit=50&fields=id,title,image', False, None),
+    'project_detail': ('GET', '/api/projects/{project_id}', False, None),
+    'projects_search': ('GET', '/api/projects/search?q={word}', False, None),
+    'home_content': ('GET', '/api/home-content', False, None),
+    'company_info': ('GET', '/api/company-info', False, None),
+    'employees': ('GET', '/api/employees', False, None),
+    'contact_cards': ('GET', '/api/contact-cards', False, None),
+    'admin_contacts': ('GET', '/api/admin/contacts', True, None),
+    'admin_contacts_filtered': ('GET', '/api/admin/contacts?status=new&q={word}', True, None),
+    'admin_contact_counts': ('GET', '/api/admin/contacts/counts', True, None),
+    'admin_contacts_search': ('GET', '/api/admin/contacts/search?q={word}', True, None),
+    'admin_project_images': ('GET', '/api/admin/projects/{project_id}/images', True, None),
+    # Writes: the spooled contact insert and password verification, each
+    # behind its rate limiter
+    'contact_submit': ('POST', '/api/contact', False, CONTACT_BODY),
+    'admin_login': ('POST', '/api/admin/login', False, LOGIN_BODY),
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark the backend API against a synthetic database')
+    parser.add_argument('--projects', type=int, default=2000, help='projects to seed')
+    parser.add_argument('--images', type=int, default=3, help='images per project')
+    parser.add_argument('--contacts', type=int, default=5000, help='contact submissions to seed')
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--mode', choices=('client', 'wsgi'), default='client',
+                        help='Flask test client in-process, or HTTP against a local threaded WSGI server')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help='comma separated subset of: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--no-cache', action='store_true', help='disable the public response cache')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for the synthetic data')
+    parser.add_argument('--output', default='benchmark_results.json', help='where to save the JSON results')
+    parser.add_argument('--compare', help='previous results file to compare against')
+    return parser.parse_args()
+
+def load_backend(args, workdir):
+    """Import the backend configured for a temporary database and uploads folder"""
+    os.environ['DATABASE_PATH'] = os.path.join(workdir, 'benchmark.db')
+    os.environ['UPLOAD_PATH'] = os.path.join(workdir, 'uploads')
+    os.environ['RATE_LIMIT_DB'] = os.path.join(workdir, 'rate_limits.db')
+    os.environ['CONTACT_SPOOL_DIR'] = os.path.join(workdir, 'contact_spool')
+    # The write scenarios go through the rate limiters without being refused
+    for route in ('CONTACT', 'LOGIN'):
+        for scope in ('IP', 'GLOBAL'):
+            os.environ.setdefault(f'RATE_LIMIT_{route}_{scope}', '1000000/1')
+    # Let every client's login wait for a hash worker rather than be shed with a 429
+    os.environ.setdefault('LOGIN_MAX_PENDING', str(args.concurrency))
+    os.environ.setdefault('QUERY_PLAN_CHECK', 'warn')
+    if args.no_cache:
+        os.environ['RESPONSE_CACHE_TTL'] = '0'
+    sys.path.insert(0, BACKEND_DIR)
+    import app as backend
+    backend.init_db()
+    return backend
+
+def seed(backend, args):
+    """Bulk insert synthetic rows; returns the seeded project ids"""
+    rng = random.Random(args.seed)
+    sentence = lambda count: ' '.join(rng.choice(WORDS) for _ in range(count))
+    # created_at is spread over 2024 by rng too, so --seed also fixes page order
+    created_at = lambda: str(datetime(2024, 1, 1) + timedelta(seconds=rng.randrange(31536000)))
+    conn = backend.connect_db()
+
+    projects = [
+        (f"{sentence(3).title()} {i}", sentence(60), rng.choice(CATEGORIES), f"{rng.choice(CITIES)}, Egypt",
+         f"{rng.randint(500, 50000)} sqm", str(rng.randint(2005, 2025)), rng.random() < 0.1, 'active',
+         created_at())
+        for i in range(args.projects)
+    ]
+    conn.executemany('''
+        INSERT INTO projects (title, description, category, location, size, year, featured, status, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', projects)
+    project_ids = [row[0] for row in conn.execute('SELECT id FROM projects')]
+
+    images = []
+    for project_id in project_ids:
+        for index in range(args.images):
+            digest = f"{rng.getrandbits(256):064x}"
+            path = f"blobs/{digest[:2]}/{digest}.jpg"
+            variants = [{'width': width, 'height': width * 2 // 3, 'path': f"blobs/{digest[:2]}/{digest}_{width}w.jpg"}
+                        for width in (320, 640, 1280)]
+            variants.append({'width': 1920, 'height': 1280, 'path': path})
+            images.append((project_id, path, f"photo_{index}.jpg", index == 0, 1920, 1280, json.dumps(variants)))
+    conn.executemany('''
+        INSERT INTO project_images (project_id, image_path, image_name, is_main, width, height, variants)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', images)
+
+    contacts = [
+        (f"Client {i}", f"client{i}@example.com", f"+20 10 {rng.randint(1000000, 9999999)}",
+         f"{rng.choice(WORDS).title()} Co", sentence(40), rng.choice(backend.CONTACT_STATUSES))
+        for i in range(args.contacts)
+    ]
+    conn.executemany('''
+        INSERT INTO contacts (name, email, phone, company, message, status)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', contacts)
+
+    conn.commit()
+    conn.execute('PRAGMA optimize')
+    conn.close()
+    return project_ids
+
+class TestClientDriver:
+    """Sends requests through the Flask test client, one client per thread"""
+
+    def __init__(self, backend):
+        self.app = backend.app
+        self.local = threading.local()
+
+    def request(self, method, path, headers, body=None):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.open(path, method=method, headers=headers, data=body)
+        response.get_data()
+        return response.status_code
+
+    def close(self):
+        pass
+
+class WSGIServerDriver:
+    """Sends HTTP requests to the app served by a local threaded WSGI server"""
+
+    def __init__(self, backend):
+        from werkzeug.serving import make_server, WSGIRequestHandler
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args):
+                pass
+
+        self.server = make_server('127.0.0.1', 0, backend.app, threaded=True, request_handler=QuietHandler)
+        self.port = self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.local = threading.local()
+
+    def request(self, method, path, headers, body=None):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = http.client.HTTPConnection('127.0.0.1', self.port)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            self.local.conn = None
+            raise
+
+    def close(self):
+        self.server.shutdown()
+
+def get_admin_token(backend):
+    with backend.app.test_client() as client:
+        response = client.post('/api/admin/login', json={'username': 'admin', 'password': 'admin123'})
+        if response.status_code != 200:
+            raise Exception(f"Failed to login: {response.get_data(as_text=True)}")
+        return response.get_json()['access_token']
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def run_scenario(driver, name, token, project_ids, args):
+    """Fire args.requests requests from args.concurrency threads; returns the summary"""
+    method, template, needs_auth, body_template = SCENARIOS[name]
+    headers = {'Accept-Encoding': 'gzip'}
+    if needs_auth:
+        headers['Authorization'] = f'Bearer {token}'
+    if body_template is not None:
+        headers['Content-Type'] = 'application/json'
+
+    rng = random.Random(args.seed)
+    paths = []
+    bodies = []
+    for n in range(args.requests):
+        fields = {'project_id': rng.choice(project_ids), 'word': rng.choice(WORDS), 'n': n}
+        paths.append(template.format(**fields))
+        bodies.append(None if body_template is None else
+                      json.dumps({key: value.format(**fields) for key, value in body_template.items()}).encode())
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    next_index = [0]
+
+    def worker():
+        while True:
+            with lock:
+                index = next_index[0]
+                next_index[0] += 1
+            if index >= len(paths):
+                return
+            started = time.perf_counter()
+            try:
+                status = driver.request(method, paths[index], headers, bodies[index])
+            except Exception as e:
+                status = repr(e)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if not (isinstance(status, int) and status < 400):
+                    errors.append(status)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    to_ms = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'error_samples': [str(error) for error in errors[:5]],
+        'rps': round(len(latencies) / wall, 1) if wall else None,
+        'mean_ms': to_ms(sum(latencies) / len(latencies)) if latencies else None,
+        'p50_ms': to_ms(percentile(latencies, 0.50)),
+        'p95_ms': to_ms(percentile(latencies, 0.95)),
+        'p99_ms': to_ms(percentile(latencies, 0.99)),
+        'max_ms': to_ms(latencies[-1]) if latencies else None,
+    }
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results, previous=None):
+    header = f"{'scenario':<24}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+    if previous:
+        header += f"{'p95 vs base':>13}"
+    print(header)
+    print('-' * len(header))
+    for name, summary in results['scenarios'].items():
+        line = (f"{name:<24}{summary['rps'] or 0:>9.1f}{summary['p50_ms'] or 0:>10.2f}"
+                f"{summary['p95_ms'] or 0:>10.2f}{summary['p99_ms'] or 0:>10.2f}{summary['errors']:>8}")
+        base = (previous or {}).get('scenarios', {}).get(name)
+        if base and base.get('p95_ms') and summary['p95_ms']:
+            line += f"{(summary['p95_ms'] / base['p95_ms'] - 1) * 100:>+12.1f}%"
+        print(line)
+
+def main():
+    args = parse_args()
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(unknown)}")
+
+    workdir = tempfile.mkdtemp(prefix='steel-bench-')
+    # The backend resolves relative paths from backend/
+    os.chdir(BACKEND_DIR)
+    backend = load_backend(args, workdir)
+
+    print(f"🌱 Seeding {args.projects} projects, {args.projects * args.images} images, {args.contacts} contacts...")
+    started = time.perf_counter()
+    project_ids = seed(backend, args)
+    print(f"   done in {time.perf_counter() - started:.1f}s")
+
+    driver = TestClientDriver(backend) if args.mode == 'client' else WSGIServerDriver(backend)
+    token = get_admin_token(backend)
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': backend.sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'config': {
+            'projects': args.projects, 'images': args.images, 'contacts': args.contacts,
+            'requests': args.requests, 'concurrency': args.concurrency, 'mode': args.mode,
+            'response_cache': not args.no_cache,
+        },
+        'scenarios': {},
+    }
+
+    print(f"🚀 {args.requests} requests per scenario, concurrency {args.concurrency}, mode {args.mode}")
+    try:
+        for name in names:
+            results['scenarios'][name] = run_scenario(driver, name, token, project_ids, args)
+    finally:
+        driver.close()
+        backend.contact_buffer.stop(timeout=5)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_results(results, previous)
+
+    output = os.path.join(ROOT_DIR, args.output) if not os.path.isabs(args.output) else args.output
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results saved to {output}")
+
+if __name__ == "__main__":
+    main()
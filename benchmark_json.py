@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for JSON serialization of the public project list
+
+Compares building the /api/projects body the old way (sqlite3.Row -> dict
+-> jsonify) with the stdlib and orjson providers, and with the rows
+serialized by SQLite itself (build_projects_query(as_json=True)).
+Runs against a throwaway database and uploads folder, removed afterwards;
+the site's own are not touched.
+
+Usage: python benchmark_json.py [projects] [iterations]
+"""
+
+import os
+import sys
+import json
+import tempfile
+import timeit
+
+from flask.json.provider import DefaultJSONProvider
+
+# The backend resolves its default paths relative to backend/
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+
+PROJECTS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+ITERATIONS = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+def load_backend(workdir):
+    """Import the backend configured for a temporary database and uploads folder"""
+    os.environ['DATABASE_PATH'] = os.path.join(workdir, 'benchmark.db')
+    os.environ['UPLOAD_PATH'] = os.path.join(workdir, 'uploads')
+    sys.path.insert(0, BACKEND_DIR)
+    os.chdir(BACKEND_DIR)
+    import app as backend
+    backend.init_db()
+    return backend
+
+def seed(conn, count):
+    """Insert projects with a main image and variant metadata"""
+    for i in range(count):
+        cursor = conn.execute('''
+            INSERT INTO projects (title, description, category, location, size, year, featured, status)
+            VALUES (?, ?, 'industrial', 'Cairo, Egypt', '12,000 sqm', '2024', ?, 'active')
+        ''', (f'Steel Project {i}', 'Pre-engineered steel structure with long-span trusses. ' * 8, i % 5 == 0))
+        path = f"blobs/{i % 100:02x}/{i:064x}.jpg"
+        variants = [{'width': w, 'height': w * 2 // 3, 'path': f"blobs/{i % 100:02x}/{i:064x}_{w}w.jpg"}
+                    for w in (320, 640, 1280)]
+        variants.append({'width': 1920, 'height': 1280, 'path': path})
+        conn.execute('''
+            INSERT INTO project_images (project_id, image_path, image_name, is_main, width, height, variants)
+            VALUES (?, ?, 'photo.jpg', 1, 1920, 1280, ?)
+        ''', (cursor.lastrowid, path, json.dumps(variants)))
+    conn.commit()
+
+def rows_to_dicts(backend, conn):
+    """The row-by-row list building get_projects() used before"""
+    query, params = backend.build_projects_query()
+    projects_list = []
+    for project in conn.execute(query, params).fetchall():
+        project_dict = dict(project)
+        project_dict['srcset'] = backend.build_srcset(project_dict.pop('main_image_variants'))
+        if project_dict['main_image']:
+            project_dict['image'] = f"http://localhost:5001/uploads/{project_dict['main_image']}"
+            project_dict['main_image'] = f"http://localhost:5001/uploads/{project_dict['main_image']}"
+        else:
+            project_dict['image'] = None
+            project_dict['main_image'] = None
+        projects_list.append(project_dict)
+    return projects_list
+
+def sqlite_json(backend, conn):
+    query, params = backend.build_projects_query(as_json=True)
+    rows = conn.execute(query, params).fetchall()
+    return backend.json_array_response(row['item'] for row in rows).get_data()
+
+def run():
+    with tempfile.TemporaryDirectory(prefix='steel-json-bench-') as workdir:
+        backend = load_backend(workdir)
+        conn = backend.connect_db()
+        try:
+            seed(conn, PROJECTS)
+            measure(backend, conn)
+        finally:
+            conn.close()
+            backend.db_pool.close_all()
+            backend.db_writer.close()
+
+def measure(backend, conn):
+    stdlib = DefaultJSONProvider(backend.app)
+    cases = [('dicts + stdlib json', lambda: stdlib.response(rows_to_dicts(backend, conn)).get_data())]
+    if backend.orjson is not None:
+        fast = backend.OrjsonProvider(backend.app)
+        cases.append(('dicts + orjson', lambda: fast.response(rows_to_dicts(backend, conn)).get_data()))
+    else:
+        print("orjson is not installed; skipping the orjson provider")
+    cases.append(('SQLite json_object', lambda: sqlite_json(backend, conn)))
+
+    print(f"📊 /api/projects body, {PROJECTS} projects, {ITERATIONS} iterations")
+    baseline = None
+    with backend.app.app_context():
+        for name, build in cases:
+            size = len(build())
+            best = min(timeit.repeat(build, number=ITERATIONS, repeat=3)) / ITERATIONS * 1000
+            baseline = baseline or best
+            print(f"   {name:<22} {best:8.3f} ms/request  {size:>8} bytes  {baseline / best:5.2f}x")
+
+if __name__ == "__main__":
+    run()
@@ -61,19 +61,30 @@ const AdminDashboard = () => {
         }));
       }
 
-      // Fetch contacts
-      const contactsResponse = await fetch('/api/admin/contacts', {
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      });
+      // Fetch the latest contacts and the per-status counts
+      const [contactsResponse, countsResponse] = await Promise.all([
+        fetch('/api/admin/contacts?limit=5', {
+          headers: {
+            'Authorization': `Bearer ${token}`
+          }
+        }),
+        fetch('/api/admin/contacts/counts', {
+          headers: {
+            'Authorization': `Bearer ${token}`
+          }
+        })
+      ]);
       
       if (contactsResponse.ok) {
         const contacts = await contactsResponse.json();
-        setRecentContacts(contacts.slice(0, 5));
+        setRecentContacts(contacts);
+      }
+      
+      if (countsResponse.ok) {
+        const counts = await countsResponse.json();
         setStats(prev => ({
           ...prev,
-          newContacts: contacts.filter(c => c.status === 'new').length
+          newContacts: counts.new
         }));
       }
 
@@ -7,23 +7,66 @@ import {
   CalendarIcon,
   MagnifyingGlassIcon,
   EyeIcon,
-  TrashIcon
+  TrashIcon,
+  ArrowDownTrayIcon
 } from '@heroicons/react/24/outline';
 
 const ContactList = () => {
   const [contacts, setContacts] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [totalCount, setTotalCount] = useState(0);
+  const [statusCounts, setStatusCounts] = useState(null);
   const [searchTerm, setSearchTerm] = useState('');
+  const [debouncedSearch, setDebouncedSearch] = useState('');
   const [statusFilter, setStatusFilter] = useState('all');
   const [selectedContact, setSelectedContact] = useState(null);
 
+  // Wait for a pause in typing before asking the server to search
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(searchTerm.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
   useEffect(() => {
     fetchContacts();
-  }, []);
+    fetchCounts();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [statusFilter, debouncedSearch]);
+
+  const buildQuery = (extra = {}) => {
+    const params = new URLSearchParams();
+    if (statusFilter !== 'all') params.set('status', statusFilter);
+    if (debouncedSearch) params.set('q', debouncedSearch);
+    Object.entries(extra).forEach(([key, value]) => params.set(key, value));
+    return params.toString();
+  };
+
+  const fetchCounts = async () => {
+    try {
+      const params = new URLSearchParams();
+      if (debouncedSearch) params.set('q', debouncedSearch);
+      const response = await fetch(`/api/admin/contacts/counts?${params.toString()}`, {
+        headers: {
+          'Authorization': `Bearer ${localStorage.getItem('admin_token')}`
+        }
+      });
+      if (response.ok) {
+        setStatusCounts(await response.json());
+      }
+    } catch (error) {
+      console.error('Error fetching contact counts:', error);
+    }
+  };
 
-  const fetchContacts = async () => {
+  // Filtering, search and paging happen on the server; a cursor appends the next page
+  const fetchContacts = async (cursor = null) => {
+    if (cursor) {
+      setLoadingMore(true);
+    }
     try {
-      const response = await fetch('/api/admin/contacts', {
+      const response = await fetch(`/api/admin/contacts?${buildQuery(cursor ? { cursor } : {})}`, {
         headers: {
           'Authorization': `Bearer ${localStorage.getItem('admin_token')}`
         }
@@ -31,7 +74,9 @@ const ContactList = () => {
       
       if (response.ok) {
         const data = await response.json();
-        setContacts(data);
+        setContacts(prev => (cursor ? [...prev, ...data] : data));
+        setNextCursor(response.headers.get('X-Next-Cursor'));
+        setTotalCount(parseInt(response.headers.get('X-Total-Count') || data.length, 10));
       }
     } catch (error) {
       console.error('Error fetching contacts:', error);
@@ -70,6 +115,7 @@ const ContactList = () => {
       ]);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -85,11 +131,17 @@ const ContactList = () => {
       });
 
       if (response.ok) {
-        setContacts(prev => 
-          prev.map(contact => 
-            contact.id === contactId ? { ...contact, status: newStatus } : contact
-          )
-        );
+        if (statusFilter !== 'all' && newStatus !== statusFilter) {
+          setContacts(prev => prev.filter(contact => contact.id !== contactId));
+          setTotalCount(prev => prev - 1);
+        } else {
+          setContacts(prev => 
+            prev.map(contact => 
+              contact.id === contactId ? { ...contact, status: newStatus } : contact
+            )
+          );
+        }
+        fetchCounts();
         toast.success('Contact status updated');
       } else if (response.status === 401) {
         toast.error('Session expired. Please login again.');
@@ -118,6 +170,8 @@ const ContactList = () => {
 
       if (response.ok) {
         setContacts(prev => prev.filter(contact => contact.id !== contactId));
+        setTotalCount(prev => prev - 1);
+        fetchCounts();
         toast.success('Contact deleted successfully');
       } else if (response.status === 401) {
         toast.error('Session expired. Please login again.');
@@ -133,14 +187,38 @@ const ContactList = () => {
     }
   };
 
-  const filteredContacts = contacts.filter(contact => {
-    const matchesSearch = 
-      contact.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      contact.email.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      contact.subject.toLowerCase().includes(searchTerm.toLowerCase());
-    const matchesStatus = statusFilter === 'all' || contact.status === statusFilter;
-    return matchesSearch && matchesStatus;
-  });
+  // The export is streamed by the server with the list's current filters
+  const handleExport = async () => {
+    try {
+      const response = await fetch(`/api/admin/contacts/export?${buildQuery({ format: 'csv' })}`, {
+        headers: {
+          'Authorization': `Bearer ${localStorage.getItem('admin_token')}`
+        }
+      });
+
+      if (response.ok) {
+        const disposition = response.headers.get('Content-Disposition') || '';
+        const match = disposition.match(/filename="([^"]+)"/);
+        const url = URL.createObjectURL(await response.blob());
+        const link = document.createElement('a');
+        link.href = url;
+        link.download = match ? match[1] : 'contacts.csv';
+        link.click();
+        URL.revokeObjectURL(url);
+      } else if (response.status === 401) {
+        toast.error('Session expired. Please login again.');
+      } else {
+        toast.error('Failed to export contacts');
+      }
+    } catch (error) {
+      console.error('Error exporting contacts:', error);
+      toast.error('Failed to export contacts');
+    }
+  };
+
+  const statusLabel = (label, status) => (
+    statusCounts ? `${label} (${statusCounts[status]})` : label
+  );
 
   const getStatusColor = (status) => {
     switch (status) {
@@ -190,24 +268,34 @@ const ContactList = () => {
               onChange={(e) => setStatusFilter(e.target.value)}
               className="px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-industrial-orange focus:border-transparent"
             >
-              <option value="all">All Status</option>
-              <option value="new">New</option>
-              <option value="replied">Replied</option>
-              <option value="archived">Archived</option>
+              <option value="all">{statusLabel('All Status', 'total')}</option>
+              <option value="new">{statusLabel('New', 'new')}</option>
+              <option value="replied">{statusLabel('Replied', 'replied')}</option>
+              <option value="archived">{statusLabel('Archived', 'archived')}</option>
             </select>
+
+            {/* Export */}
+            <button
+              onClick={handleExport}
+              className="btn btn-outline text-sm flex items-center gap-2"
+              title="Export the filtered contacts as CSV"
+            >
+              <ArrowDownTrayIcon className="h-4 w-4" />
+              Export CSV
+            </button>
           </div>
         </div>
 
         {/* Contacts List */}
         <div className="bg-white rounded-lg shadow-light overflow-hidden">
           <div className="divide-y divide-gray-200">
-            {filteredContacts.map((contact, index) => (
+            {contacts.map((contact, index) => (
               <motion.div
                 key={contact.id}
                 className="p-4 hover:bg-gray-50 transition-colors"
                 initial={{ opacity: 0, y: 20 }}
                 animate={{ opacity: 1, y: 0 }}
-                transition={{ duration: 0.3, delay: index * 0.05 }}
+                transition={{ duration: 0.3, delay: (index % 50) * 0.05 }}
               >
                 <div className="flex items-start justify-between">
                   <div className="flex-1 min-w-0">
@@ -274,8 +362,24 @@ const ContactList = () => {
           </div>
         </div>
 
+        {/* Pagination */}
+        {contacts.length > 0 && (
+          <div className="flex items-center justify-between text-sm text-steel-gray">
+            <span>Showing {contacts.length} of {totalCount}</span>
+            {nextCursor && (
+              <button
+                onClick={() => fetchContacts(nextCursor)}
+                disabled={loadingMore}
+                className="btn btn-outline text-sm"
+              >
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            )}
+          </div>
+        )}
+
         {/* Empty State */}
-        {filteredContacts.length === 0 && (
+        {contacts.length === 0 && (
           <div className="text-center py-12">
             <EnvelopeIcon className="mx-auto h-12 w-12 text-steel-gray-light mb-4" />
             <h3 className="text-lg font-medium text-steel-gray mb-2">No contacts found</h3>
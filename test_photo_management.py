@@ -53,7 +53,8 @@ def test_home_content_images():
                            headers=headers, files=files)
     print(f"✅ Hero image upload: {response.status_code} - {response.text}")
     
-    if response.status_code == 200:
+    # 202: the upload is stored and its processing is queued
+    if response.ok:
         image_id = response.json().get('images', [{}])[0].get('id')
         
         # Test getting home content